@@ -1,13 +1,26 @@
-import configparser
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Dict, Optional
 from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from starlette.middleware.cors import CORSMiddleware
 from src.clients.token_manager import TokenManager
-from src.middleware.timing_middleware import TimingMiddleware
+from src.clients.async_https_client import AsyncHTTPSClient
+from src.clients.device_auth_prober import DeviceAuthProber
+from src.middleware.timing_middleware import TimingMiddleware, response_time
+from src.utils.metrics import HTTP_REQUEST_SECONDS, registry as metrics_registry
 from src.models.request_models import MessageRequest
 from src.clients.restaurant_client import RestaurantClient
+from src.clients.table_content_cache import TableContentCache
+from src.clients.tcp_connection_pool import TCPConnectionPool
 from src.clients.mock_restaurant_client import RestaurantMockClient
 from src.order_processor.order_chain import OrderProcessorChain
+from src.clients.model_client_registry import ModelClientRegistry
+from src.config.settings import Settings, SettingsManager
 import logging
 import os
 
@@ -15,7 +28,34 @@ import os
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm-up runs in the background so the server starts accepting requests
+    # right away; until it finishes, requests use the persisted catalog snapshot.
+    app.state.warmup = WarmupState()
+    warmup_task = asyncio.create_task(warm_up(app.state.warmup))
+    get_settings_manager().start_watching()
+    token_manager = get_token_manager()
+    token_manager.start_background_refresh()
+    yield
+    warmup_task.cancel()
+    try:
+        await warmup_task
+    except asyncio.CancelledError:
+        pass
+    await token_manager.stop_background_refresh()
+    await get_restaurant_client(
+        token_manager, get_connection_pool(), get_table_content_cache(), get_settings()
+    ).close()
+    await token_manager.flush_state()
+    await get_https_client().close()
+    await get_settings_manager().stop_watching()
+    await get_connection_pool().close()
+    await ModelClientRegistry().close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS Middleware
 app.add_middleware(
@@ -26,23 +66,113 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-app.add_middleware(TimingMiddleware)
 
-def read_config_file(filename):
-    config = configparser.ConfigParser()
-    config.read(filename)
-    return config
+def record_request_timing(method: str, route: str, status_code: int, seconds: float):
+    HTTP_REQUEST_SECONDS.observe(seconds, method=method, route=route, status=status_code)
+
+
+app.add_middleware(TimingMiddleware, sink=record_request_timing)
+
 
+@lru_cache(maxsize=None)
+def get_settings_manager() -> SettingsManager:
+    # config.ini is read once here and again only when it changes (or on SIGHUP)
+    return SettingsManager("config.ini")
 
-def get_token_manager():
-    config = read_config_file("config.ini")["Settings"]
-    APP_MODE = config.get("app_mode", "prod")  # Default to 'prod' if not specified
-    use_mock = APP_MODE.lower() == "dev"
-    coti_api_url = config.get("coti_cloud_services_url", "http://localhost:8005")
-    token_manager = TokenManager(use_mock=use_mock, url=coti_api_url)
+
+def get_settings() -> Settings:
+    return get_settings_manager().settings
+
+
+@lru_cache(maxsize=None)
+def get_token_manager() -> TokenManager:
+    # TokenManager is a singleton that ignores later constructor arguments, so
+    # it is built once and follows settings reloads through its subscription
+    settings = get_settings()
+    token_manager = TokenManager(
+        use_mock=settings.use_mock,
+        url=settings.coti_cloud_services_url,
+        refresh_fraction=settings.token_refresh_fraction,
+        https_client=get_https_client(),
+        device_prober=get_device_auth_prober(),
+    )
+    get_settings_manager().subscribe(token_manager.apply_settings)
     return token_manager
 
 
+@lru_cache(maxsize=None)
+def get_https_client() -> AsyncHTTPSClient:
+    # One pooled client, so token renewals reuse keep-alive connections
+    return AsyncHTTPSClient.from_settings(get_settings())
+
+
+@lru_cache(maxsize=None)
+def get_device_auth_prober() -> DeviceAuthProber:
+    # Shared, so the last credential that worked is tried first next time
+    return DeviceAuthProber.from_settings(get_settings())
+
+
+@lru_cache(maxsize=None)
+def get_connection_pool() -> TCPConnectionPool:
+    # The pool keeps warm POS connections, so it must outlive a single request
+    return TCPConnectionPool.from_settings(get_settings())
+
+
+@lru_cache(maxsize=None)
+def get_table_content_cache() -> TableContentCache:
+    return TableContentCache.from_settings(get_settings())
+
+
+class WarmupState:
+    """Progress of the startup warm-up, reported by the readiness endpoint."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.ready = False
+        self.time_to_ready: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+
+async def _run_warmup_stage(state: WarmupState, name: str, coro):
+    start = time.perf_counter()
+    try:
+        await coro
+        state.stages[name] = time.perf_counter() - start
+        logger.info(f"Warm-up stage '{name}' finished in {state.stages[name]:.3f}s.")
+    except Exception as e:
+        state.errors[name] = str(e)
+        logger.error(f"Warm-up stage '{name}' failed: {e}")
+
+
+async def _load_products_and_emojis(client: RestaurantClient):
+    """Load the catalog and precompute the dish emojis used in bill messages."""
+    await client.load_products()
+    emoji_index = get_order_processor_chain().message_renderer.emoji_index
+    emoji_index.index_names(product.name for product in client.products.values())
+
+
+async def warm_up(state: WarmupState):
+    """Fetch the token, product catalog, table list and token encoding concurrently."""
+    token_manager = get_token_manager()
+    client = get_restaurant_client(
+        token_manager, get_connection_pool(), get_table_content_cache(), get_settings()
+    )
+    await asyncio.gather(
+        _run_warmup_stage(state, "token", token_manager.get_token()),
+        _run_warmup_stage(state, "products", _load_products_and_emojis(client)),
+        _run_warmup_stage(state, "tables", client.fetch_tables()),
+        _run_warmup_stage(
+            state,
+            "encoding",
+            get_order_processor_chain().prompt_compactor.load_encoding(),
+        ),
+    )
+    state.time_to_ready = time.perf_counter() - state.started_at
+    state.ready = not state.errors
+    logger.info(f"Warm-up finished in {state.time_to_ready:.3f}s, ready={state.ready}.")
+
+
 class BaseResponse(BaseModel):
     response_time: float
 
@@ -51,14 +181,31 @@ class ValidateAuthResponse(BaseResponse):
     is_authenticated: bool
 
 
+class ReadinessResponse(BaseModel):
+    ready: bool
+    time_to_ready: Optional[float] = None
+    stages: Dict[str, float]
+    errors: Dict[str, str]
+
+
 # Dependency that will create and return the RestaurantClient or RestaurantMockClient instance
-def get_restaurant_client(token_manager: TokenManager = Depends(get_token_manager)):
+def get_restaurant_client(
+    token_manager: TokenManager = Depends(get_token_manager),
+    connection_pool: TCPConnectionPool = Depends(get_connection_pool),
+    table_content_cache: TableContentCache = Depends(get_table_content_cache),
+    settings: Settings = Depends(get_settings),
+):
     if token_manager.use_mock:
         logger.info("Running in development mode. Using RestaurantMockClient.")
         return RestaurantMockClient(token_manager=token_manager)
     else:
         logger.info("Running in production mode. Using RestaurantClient.")
-        return RestaurantClient(token_manager=token_manager)
+        return RestaurantClient(
+            token_manager=token_manager,
+            connection_pool=connection_pool,
+            table_content_cache=table_content_cache,
+            settings=settings,
+        )
 
 
 # Dependency that will create and return the OrderProcessorChain instance
@@ -84,8 +231,69 @@ async def validate_auth(token_manager: TokenManager = Depends(get_token_manager)
     """
     is_authenticated = await token_manager.is_authenticated()
     return ValidateAuthResponse(
-        is_authenticated=is_authenticated, response_time=0.0
-    )  # response_time will be updated by middleware
+        is_authenticated=is_authenticated, response_time=response_time()
+    )
+
+
+@app.get("/health/ready", response_model=ReadinessResponse)
+async def readiness():
+    """
+    Report whether the startup warm-up has finished.
+
+    Returns 503 while warming up or if a warm-up stage failed.
+    """
+    state: WarmupState = app.state.warmup
+    body = ReadinessResponse(
+        ready=state.ready,
+        time_to_ready=state.time_to_ready,
+        stages=state.stages,
+        errors=state.errors,
+    )
+    return JSONResponse(
+        content=body.model_dump(), status_code=200 if state.ready else 503
+    )
+
+
+@app.get("/stats/table-content")
+async def table_content_stats(
+    table_content_cache: TableContentCache = Depends(get_table_content_cache),
+):
+    """
+    Hit, miss and coalesced request counters of the table content cache.
+    """
+    return table_content_cache.stats()
+
+
+@app.get("/stats/llm-cache")
+async def llm_cache_stats(
+    order_processor: OrderProcessorChain = Depends(get_order_processor_chain),
+):
+    """
+    Hit rate and saved model latency of the LLM chain cache.
+    """
+    if order_processor.chain_cache is None:
+        return {}
+    return order_processor.chain_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Latency histograms and counters in the Prometheus text format.
+    """
+    return PlainTextResponse(
+        metrics_registry.render(), media_type=metrics_registry.CONTENT_TYPE
+    )
+
+
+@app.get("/stats/prompt-tokens")
+async def prompt_token_stats(
+    order_processor: OrderProcessorChain = Depends(get_order_processor_chain),
+):
+    """
+    Parser prompt tokens sent, tokens saved by compaction and budget rejections.
+    """
+    return order_processor.prompt_compactor.stats()
 
 
 # @app.post("/message/")
@@ -112,40 +320,77 @@ async def create_board_message(
             raise HTTPException(status_code=404, detail="Table content not found.")
 
         # Create the file name based on the table_id
-        file_name = f"comanda_{table_id}.txt"
+        file_name = f"comanda_{table_id}.json"
         file_path = os.path.join(os.getcwd(), file_name)
 
-        processed_table_items = []
-
-        # Format the order
-        formatted_order = ""
-        for item in table_order.get("content", []):
-            product_name = item.get("itemName", "Not found")
-            quantity = item.get("quantity", 1)
-            price = item.get("price", 0.0)
-            total = item.get("total", 0.0)
-            # Format the line
-            line = f"{product_name} - {quantity} X R$ {price:.2f} = R$ {total:.2f}\n"
-            formatted_order += line
-            processed_table_items.append(
-                {
-                    "product_name": product_name,
-                    "quantity": quantity,
-                    "price": price,
-                    "total": total,
-                }
-            )
-
-        # Process the formatted order
-        print("Formatted order:", formatted_order)
-        order = await order_processor.main(formatted_order, file_path)
-        order["details"]["orders"] = processed_table_items
+        # Process the board content
+        order = await order_processor.main_from_board(
+            table_id, table_order["content"], file_path
+        )
+        order["details"]["orders"] = processed_table_items(table_order["content"])
+        order["response_time"] = response_time()
         return order
 
     except Exception as e:
         handle_request_exception(e)
 
 
+def processed_table_items(content: list) -> list:
+    return [
+        {
+            "product_name": item.get("itemName", "Not found"),
+            "quantity": item.get("quantity", 1),
+            "price": item.get("price", 0.0),
+            "total": item.get("total", 0.0),
+        }
+        for item in content
+    ]
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.get("/tables/{table_id}/message/stream")
+async def stream_board_message(
+    table_id: int,
+    client: RestaurantClient = Depends(get_restaurant_client),
+    order_processor: OrderProcessorChain = Depends(get_order_processor_chain),
+):
+    """
+    Server-Sent Events variant of /tables/{table_id}/message/.
+
+    Emits a "totals" event with the locally computed totals and item list as
+    soon as the board is processed, then "message" events with the message
+    text as it is generated, and a final "done" event with the full message.
+    Failures after the stream has started are reported as an "error" event.
+    """
+    try:
+        table_order = await client.fetch_table_content(table_id)
+        if not table_order["content"]:
+            raise HTTPException(status_code=404, detail="Table content not found.")
+    except Exception as e:
+        handle_request_exception(e)
+
+    async def events():
+        try:
+            async for event, data in order_processor.stream_from_board(
+                table_id, table_order["content"]
+            ):
+                if event == "totals":
+                    data["orders"] = processed_table_items(table_order["content"])
+                yield _sse(event, data)
+        except Exception as e:
+            logger.error(f"Streaming message for table {table_id} failed: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/load/products/")
 async def load_products(
     client: RestaurantClient = Depends(get_restaurant_client),
@@ -172,7 +417,8 @@ async def get_table(
     """
     try:
         table_data = await client.fetch_table_content(table_id)
-        return table_data
+        # Cached board contents are shared, so add the timing to a copy
+        return {**table_data, "response_time": response_time()}
     except Exception as e:
         handle_request_exception(e)
 
@@ -209,7 +455,11 @@ async def set_payment_status(
     try:
         # Send a POSTQUEUE message to set the payment status
         response = await client.prebill(table_id)
-        return {"status": "Payment status set successfully", "response": response}
+        return {
+            "status": "Payment status set successfully",
+            "response": response,
+            "response_time": response_time(),
+        }
 
     except HTTPException as http_exc:
         # Re-raise HTTP exceptions to maintain consistent error responses
@@ -241,7 +491,11 @@ async def close_table_endpoint(
     try:
         # Send a POSTQUEUE message to close the table
         response = await client.close_table(table_id)
-        return {"status": "Table closed successfully", "response": response}
+        return {
+            "status": "Table closed successfully",
+            "response": response,
+            "response_time": response_time(),
+        }
 
     except HTTPException as http_exc:
         # Re-raise HTTP exceptions to maintain consistent error responses
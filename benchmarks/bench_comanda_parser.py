@@ -0,0 +1,66 @@
+"""
+Compare the structured comanda builder with the LLM parser (process_comanda),
+and report the parser prompt size with and without compaction.
+
+The LLM path is only measured when OPENAI_API_KEY is set, since it needs a
+real gpt-4o-mini round trip.
+
+Run from the repository root:
+    python -m benchmarks.bench_comanda_parser
+"""
+
+import asyncio
+import os
+import time
+import timeit
+
+from benchmarks.fake_pos_server import build_board, build_products
+from src.order_processor.comanda_builder import format_board_items
+from src.order_processor.order_chain import OrderProcessorChain
+
+LINES = 24
+LLM_RUNS = 3
+
+
+def build_items():
+    products = build_products(100)
+    names = {str(p["id"]): p["name"] for p in products}
+    items = build_board(12, products, lines=LINES)["content"]
+    for item in items:
+        item["itemName"] = names[item["itemId"]]
+    return items
+
+
+async def main():
+    items = build_items()
+    processor = OrderProcessorChain()
+
+    runs = 1000
+    structured = timeit.timeit(lambda: processor.process_board(12, items), number=runs)
+    print(f"Parsing a {LINES}-line board:")
+    print(f"  structured builder {structured / runs * 1000:10.3f} ms")
+
+    for rounds in (1, 4):
+        request = processor.prompt_compactor.for_board(12, items * rounds)
+        print(
+            f"Parser prompt tokens, {LINES * rounds} lines: "
+            f"{request.uncompacted_tokens} uncompacted, {request.tokens} compacted"
+        )
+
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        print("  LLM parser          skipped (set OPENAI_API_KEY to measure)")
+        return
+
+    processor.api_key = api_key
+    comanda_text = format_board_items(items)
+    best = float("inf")
+    for _ in range(LLM_RUNS):
+        start = time.perf_counter()
+        await processor.process_comanda(comanda_text)
+        best = min(best, time.perf_counter() - start)
+    print(f"  LLM parser         {best * 1000:10.3f} ms (best of {LLM_RUNS})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
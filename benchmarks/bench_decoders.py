@@ -0,0 +1,63 @@
+"""
+Benchmark the GETDATALIST decoding pipeline on a synthetic 5000-item
+XDPeople.Entities.MobileItem payload.
+
+Run from the repository root:
+    python -m benchmarks.bench_decoders
+"""
+
+import base64
+import json
+import timeit
+
+import orjson
+
+from src.models.entity_models import Product
+from src.utils.decoders import _list_adapter, decode_base64_model_list
+
+ITEMS = 5000
+REPEAT = 20
+
+
+def build_payload(items: int = ITEMS) -> bytes:
+    """Build a Base64 encoded MobileItem list like the one sent by the POS."""
+    products = [
+        {
+            "id": 1000 + i,
+            "name": f"Produto {i} - Chopp Brahma 300ml",
+            "parentId": i % 40,
+            "visible": i % 7 != 0,
+        }
+        for i in range(items)
+    ]
+    return base64.b64encode(json.dumps(products).encode("utf-8"))
+
+
+def legacy_decode(encoded: bytes):
+    decoded_str = base64.b64decode(encoded).decode("utf-8")
+    return [Product(**item) for item in json.loads(decoded_str)]
+
+
+def orjson_validate_python(encoded: bytes):
+    return _list_adapter(Product).validate_python(
+        orjson.loads(base64.b64decode(encoded))
+    )
+
+
+def main():
+    encoded = build_payload()
+    assert legacy_decode(encoded) == decode_base64_model_list(encoded, Product)
+
+    cases = {
+        "json.loads + Product(**item)": legacy_decode,
+        "orjson + TypeAdapter.validate_python": orjson_validate_python,
+        "TypeAdapter.validate_json": lambda e: decode_base64_model_list(e, Product),
+    }
+    print(f"Decoding {ITEMS} products, best of {REPEAT} runs:")
+    for name, fn in cases.items():
+        best = min(timeit.repeat(lambda: fn(encoded), number=1, repeat=REPEAT))
+        print(f"  {name:<40} {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
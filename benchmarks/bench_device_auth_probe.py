@@ -0,0 +1,65 @@
+"""
+Compare sequential and concurrent device auth probing.
+
+The local UDP stub only answers one of CREDENTIALS credentials, and it is
+ranked near the end, so every stale credential ahead of it costs a full probe
+timeout. ``max_concurrency=1`` is the previous one-at-a-time behaviour; the
+last row probes again with that sequential prober, which now tries the
+remembered credential first.
+
+Run from the repository root:
+    python -m benchmarks.bench_device_auth_probe
+"""
+
+import asyncio
+import time
+
+from benchmarks.fake_device_auth_server import FakeDeviceAuthServer
+from benchmarks.fake_myxd_server import build_credentials
+from src.clients.device_auth_prober import DeviceAuthProber
+
+CREDENTIALS = 10
+WORKING = 7  # Index of the only credential the POS accepts
+TIMEOUT = 0.5
+LATENCY = 0.01
+
+
+async def timed_probe(prober: DeviceAuthProber, credentials) -> tuple:
+    start = time.perf_counter()
+    result = await prober.probe(credentials)
+    assert result is not None
+    return time.perf_counter() - start, result[0]["credentialId"]
+
+
+async def main():
+    credentials = build_credentials(CREDENTIALS)
+    server = FakeDeviceAuthServer(
+        valid_codes={credentials[WORKING]["authorization"]}, latency=LATENCY
+    )
+    host, port = await server.start()
+
+    print(
+        f"{CREDENTIALS} credentials, only #{WORKING + 1} works, "
+        f"{TIMEOUT * 1000:.0f} ms probe timeout:"
+    )
+    probers = {}
+    for concurrency in (1, 4, CREDENTIALS):
+        prober = probers[concurrency] = DeviceAuthProber(
+            host, port, timeout=TIMEOUT, max_concurrency=concurrency
+        )
+        seconds, credential_id = await timed_probe(prober, credentials)
+        print(
+            f"  max_concurrency={concurrency:<3} {seconds * 1000:8.1f} ms  "
+            f"probes {prober.probes:<3} winner {credential_id}"
+        )
+
+    seconds, credential_id = await timed_probe(probers[1], credentials)
+    print(
+        f"  max_concurrency=1, remembered {seconds * 1000:8.1f} ms  "
+        f"winner {credential_id}"
+    )
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""
+Compare the local message renderer with the message_enhancer LLM step.
+
+The LLM path is only measured when OPENAI_API_KEY is set, since it needs a
+real gpt-4o-mini round trip.
+
+Run from the repository root:
+    python -m benchmarks.bench_message_renderer
+"""
+
+import asyncio
+import os
+import time
+import timeit
+
+from benchmarks.bench_comanda_parser import build_items
+from src.order_processor.order_chain import OrderProcessorChain
+
+LLM_RUNS = 3
+
+
+async def main():
+    processor = OrderProcessorChain()
+    comanda_data = processor.process_board(12, build_items())
+    lines = len(comanda_data.pedidos)
+
+    runs = 10000
+    local = timeit.timeit(
+        lambda: processor.message_renderer.render(comanda_data), number=runs
+    )
+    print(f"Rendering a {lines}-line bill:")
+    print(f"  local renderer {local / runs * 1000:10.3f} ms")
+
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        print("  LLM enhancer    skipped (set OPENAI_API_KEY to measure)")
+        return
+
+    processor.api_key = api_key
+    processor.use_llm_enhancer = True
+    best = float("inf")
+    for _ in range(LLM_RUNS):
+        start = time.perf_counter()
+        await processor.build_and_save_message(comanda_data)
+        best = min(best, time.perf_counter() - start)
+    print(f"  LLM enhancer   {best * 1000:10.3f} ms (best of {LLM_RUNS})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
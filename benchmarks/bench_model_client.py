@@ -0,0 +1,63 @@
+"""
+Compare a fresh ChatOpenAI per call with the shared ModelClientRegistry.
+
+Runs against the local OpenAI-compatible stub server, so no API key or
+network access is needed. Also checks that the registry retries 429s.
+
+Run from the repository root:
+    python -m benchmarks.bench_model_client
+"""
+
+import asyncio
+import time
+
+from langchain_openai import ChatOpenAI
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from prompt import message_enhancer_prompt
+from src.clients.model_client_registry import ModelClientRegistry
+
+MODEL = "gpt-4o-mini-2024-07-18"
+KEY = "sk-stub"
+CALLS = 50
+INPUTS = {"message": "🍽 Chopp\n2 un. x R$ 12.50 = R$ 25.00"}
+
+
+async def timed(get_model) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await (message_enhancer_prompt | get_model()).ainvoke(INPUTS)
+    return (time.perf_counter() - start) / CALLS
+
+
+async def main():
+    server = FakeOpenAIServer()
+    base_url = await server.start()
+
+    fresh = await timed(
+        lambda: ChatOpenAI(
+            model_name=MODEL, temperature=0.0, openai_api_key=KEY, openai_api_base=base_url
+        )
+    )
+    fresh_connections = server.connections
+
+    registry = ModelClientRegistry()
+    registry.base_url = base_url
+    registry.backoff_base = 0.01
+    shared = await timed(lambda: registry.get_model(MODEL, KEY))
+    shared_connections = server.connections - fresh_connections
+
+    print(f"{CALLS} sequential calls against the stub server:")
+    print(f"  fresh ChatOpenAI  {fresh * 1000:8.2f} ms/call, {fresh_connections} connections")
+    print(f"  shared registry   {shared * 1000:8.2f} ms/call, {shared_connections} connections")
+
+    server.requests, server.fail_first = 0, 2
+    await (message_enhancer_prompt | registry.get_model(MODEL, KEY)).ainvoke(INPUTS)
+    print(f"  429 retries       {registry.stats()['retries']} (server failed the first 2)")
+
+    await registry.close()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""
+Compare the blocking HTTPSClient with AsyncHTTPSClient on the MyXD
+authenticate + match credentials calls.
+
+The stub server runs on its own thread and event loop, the way the Azure
+endpoint is out of the application's hands. A heartbeat task ticks every
+TICK seconds on the application loop; its worst delay shows how long the
+loop was blocked while authenticating. Also checks that the async client
+retries 503s.
+
+Run from the repository root:
+    python -m benchmarks.bench_myxd_auth
+"""
+
+import asyncio
+import threading
+import time
+
+from benchmarks.fake_myxd_server import FakeMyXDServer
+from src.clients.async_https_client import AsyncHTTPSClient
+from src.clients.https_client import HTTPSClient
+
+LATENCY = 0.05
+FLOWS = 10
+TICK = 0.005
+CREDENTIALS = ("info@xd.pt", "xd", "mobileapps", "")
+APP_CREDENTIALS = ("XDBR.105112", "1234")
+
+
+class ServerThread:
+    """Runs a FakeMyXDServer on a background event loop."""
+
+    def __init__(self, server: FakeMyXDServer):
+        self.server = server
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self) -> str:
+        self._thread.start()
+        return asyncio.run_coroutine_threadsafe(self.server.start(), self.loop).result()
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+async def heartbeat(stop: asyncio.Event) -> float:
+    """Worst delay of a TICK-second sleep until ``stop`` is set."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        worst = max(worst, time.perf_counter() - start - TICK)
+    return worst
+
+
+async def measure(flow) -> tuple:
+    """(seconds per flow, worst loop stall) over FLOWS sequential flows."""
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(TICK)
+    start = time.perf_counter()
+    for _ in range(FLOWS):
+        assert await flow()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed / FLOWS, await beat
+
+
+async def main():
+    server = FakeMyXDServer(latency=LATENCY)
+    with ServerThread(server) as base_url:
+        sync_client = HTTPSClient()
+        sync_client.base_url = base_url
+        sync_client.auth_url = f"{base_url}/oauth/token"
+
+        async def blocking_flow():
+            # What TokenManager did before: blocking calls on the event loop
+            return sync_client.authenticate(*CREDENTIALS) and sync_client.match_credentials(
+                *APP_CREDENTIALS
+            )
+
+        async_client = AsyncHTTPSClient(base_url=base_url)
+
+        async def async_flow():
+            return await async_client.authenticate(
+                *CREDENTIALS
+            ) and await async_client.match_credentials(*APP_CREDENTIALS)
+
+        print(f"Authenticate + match credentials, {FLOWS} flows, {LATENCY * 1000:.0f} ms per call:")
+        for name, flow in {"HTTPSClient (requests)": blocking_flow, "AsyncHTTPSClient": async_flow}.items():
+            connections = server.connections
+            per_flow, stall = await measure(flow)
+            print(
+                f"  {name:<24} {per_flow * 1000:7.1f} ms/flow  "
+                f"worst loop stall {stall * 1000:7.1f} ms  "
+                f"connections {server.connections - connections}"
+            )
+        await async_client.close()
+
+    retry_server = FakeMyXDServer(fail_first=2)
+    with ServerThread(retry_server) as base_url:
+        client = AsyncHTTPSClient(base_url=base_url, max_retries=3)
+        ok = await client.authenticate(*CREDENTIALS)
+        print(f"Retries after two 503s: {client.retries}, authenticated: {ok}")
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
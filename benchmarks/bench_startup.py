@@ -0,0 +1,70 @@
+"""
+Measure cold start to first served table lookup.
+
+Compares a RestaurantClient that has to fetch the full product catalog from
+the POS before it can answer (no snapshot on disk) with one that starts from
+the persisted catalog snapshot while the catalog refresh runs in the
+background. Uses a local fake POS server with 5000 products.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.fake_pos_server import FakePOSServer
+from src.clients.restaurant_client import RestaurantClient
+from src.clients.tcp_connection_pool import TCPConnectionPool
+from src.clients.token_manager import TokenManager
+
+POS_LATENCY = 0.05  # Seconds the fake POS spends on every message
+
+
+def new_client(port: int) -> RestaurantClient:
+    RestaurantClient._instance = None
+    token_manager = TokenManager(use_mock=True)
+    pool = TCPConnectionPool(target_ip="127.0.0.1", target_port=port)
+    return RestaurantClient(token_manager=token_manager, connection_pool=pool)
+
+
+async def time_to_first_lookup(port: int, warm_in_background: bool) -> float:
+    start = time.perf_counter()
+    client = new_client(port)
+    warmup = None
+    if warm_in_background:
+        warmup = asyncio.create_task(client.load_products())
+    await client.fetch_table_content(12)
+    elapsed = time.perf_counter() - start
+    if warmup:
+        await warmup
+    await client.close()
+    await client.connection_pool.close()
+    return elapsed
+
+
+async def main():
+    server = FakePOSServer(latency=POS_LATENCY)
+    port = await server.start()
+    snapshot_path = os.path.join("cache", "products.json")
+
+    # Cold start without a snapshot: the first lookup waits for the catalog
+    if os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+    without_snapshot = await time_to_first_lookup(port, warm_in_background=False)
+
+    # The previous run persisted the snapshot; start again from it
+    with_snapshot = await time_to_first_lookup(port, warm_in_background=True)
+
+    await server.stop()
+    print("Cold start to first served /tables/{id} lookup:")
+    print(f"  without snapshot (blocking catalog fetch) {without_snapshot * 1000:8.1f} ms")
+    print(f"  with persisted snapshot + background warm {with_snapshot * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    # Run in a scratch directory so the token and catalog files stay out of the repo
+    os.chdir(tempfile.mkdtemp())
+    asyncio.run(main())
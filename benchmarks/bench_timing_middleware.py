@@ -0,0 +1,90 @@
+"""
+Compare the pure ASGI TimingMiddleware with the previous BaseHTTPMiddleware
+version, which re-parsed and re-serialized every JSON body to inject
+``response_time``.
+
+Serves a pre-encoded 5000-product JSON body (the size of /load/products/)
+through each middleware in-process, so the numbers show the middleware's own
+cost rather than the endpoint's serialization.
+
+Run from the repository root:
+    python -m benchmarks.bench_timing_middleware
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, Response
+
+from benchmarks.fake_pos_server import build_products
+from src.middleware.timing_middleware import TimingMiddleware
+
+REQUESTS = 100
+ROUNDS = 5
+
+
+class LegacyTimingMiddleware(BaseHTTPMiddleware):
+    """The middleware as it was before, kept here for comparison."""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+
+        if response.headers.get("Content-Type", "").startswith("application/json"):
+            body = [section async for section in response.body_iterator]
+            body_str = b"".join(body).decode()
+            data = json.loads(body_str) if body_str else {}
+            data["response_time"] = process_time
+            return JSONResponse(content=data, status_code=response.status_code)
+
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+def build_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+    body = json.dumps({"products": build_products(5000)}).encode()
+
+    @app.get("/products")
+    async def products():
+        return Response(body, media_type="application/json")
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def measure(app: FastAPI) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/products")
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            response = await client.get("/products")
+            response.raise_for_status()
+        return (time.perf_counter() - start) / REQUESTS
+
+
+async def main():
+    apps = {
+        "no middleware": build_app(),
+        "BaseHTTPMiddleware (old)": build_app(LegacyTimingMiddleware),
+        "pure ASGI (new)": build_app(TimingMiddleware),
+    }
+    best = {name: float("inf") for name in apps}
+    for _ in range(ROUNDS):
+        for name, app in apps.items():
+            best[name] = min(best[name], await measure(app))
+
+    print(f"GET of a 5000-product JSON body, best mean of {ROUNDS}x{REQUESTS} requests:")
+    for name, elapsed in best.items():
+        print(f"  {name:26} {elapsed * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
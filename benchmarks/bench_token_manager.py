@@ -0,0 +1,82 @@
+"""
+Measure TokenManager.get_token() throughput with a valid token, against the
+previous expiry check that logged at INFO on every call.
+
+Log output goes to os.devnull, so the numbers show the cost of formatting and
+emitting the records rather than of the terminal.
+
+Run from the repository root:
+    python -m benchmarks.bench_token_manager
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from src.clients.token_manager import TokenManager
+
+CALLS = 100_000
+ROUNDS = 5
+
+logger = logging.getLogger("src.clients.token_manager")
+
+
+def legacy_is_token_expired(token_manager: TokenManager) -> bool:
+    """The expiry check as it was before, minus the file deletion on expiry."""
+    logger.info(f"Token expiration timestamp: {token_manager.token_expiration}")
+    if not token_manager.token_expiration:
+        logger.warning("Token expiration not set. Considered expired.")
+        return True
+    is_expired = time.time() >= token_manager.token_expiration
+    if not is_expired:
+        time_left = token_manager.token_expiration - time.time()
+        logger.debug(f"Token is valid for {time_left:.2f} more seconds.")
+    return is_expired
+
+
+async def legacy_get_token(token_manager: TokenManager) -> str:
+    if token_manager.state == "Authenticated" and not legacy_is_token_expired(token_manager):
+        return token_manager.token
+    raise RuntimeError("The benchmark token should never expire")
+
+
+async def measure(get_token) -> float:
+    """Best calls/second over ROUNDS rounds."""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            await get_token()
+        best = min(best, time.perf_counter() - start)
+    return CALLS / best
+
+
+async def run():
+    token_manager = TokenManager(use_mock=True)
+    token_manager.token = "bench_token"
+    token_manager.token_expiration = time.time() + 3600
+    token_manager.token_issued_at = time.time()
+    token_manager.state = "Authenticated"
+
+    cases = {
+        "is_token_expired with INFO logging": lambda: legacy_get_token(token_manager),
+        "in-memory is_token_expired": token_manager.get_token,
+    }
+    print(f"get_token() with a valid token, best of {ROUNDS} x {CALLS} calls:")
+    for name, get_token in cases.items():
+        calls_per_second = await measure(get_token)
+        print(
+            f"  {name:<40} {calls_per_second:12,.0f} calls/s "
+            f"{1e9 / calls_per_second:8.0f} ns/call"
+        )
+
+
+def main():
+    handler = logging.FileHandler(os.devnull)
+    logging.basicConfig(level=logging.INFO, handlers=[handler], force=True)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
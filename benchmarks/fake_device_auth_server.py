@@ -0,0 +1,59 @@
+"""
+Minimal UDP stub of the POS device authentication endpoint.
+
+Answers a DeviceAuthenticationRequest with a DeviceConfiguration (echoing the
+deviceId) when its authorization code is in ``valid_codes``; other requests
+get no answer, like a stale credential on the real POS. Each answer is sent
+after a fixed ``latency``.
+"""
+
+import asyncio
+import json
+
+EOM = "[EOM]"
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, server: "FakeDeviceAuthServer"):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        request = json.loads(data.decode("utf-8").replace(EOM, ""))
+        self.server.requests += 1
+        if request.get("authorizationCode") not in self.server.valid_codes:
+            return
+        response = {
+            "deviceId": request["deviceId"],
+            "Token": f"device-token-{request['authorizationCode']}",
+        }
+        asyncio.get_running_loop().call_later(
+            self.server.latency,
+            self.transport.sendto,
+            (json.dumps(response) + EOM).encode("utf-8"),
+            addr,
+        )
+
+
+class FakeDeviceAuthServer:
+    def __init__(self, valid_codes=(), latency: float = 0.0):
+        self.valid_codes = set(valid_codes)
+        self.latency = latency
+        self.requests = 0
+        self._transport = None
+
+    @property
+    def address(self):
+        return self._transport.get_extra_info("sockname")[:2]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: _Protocol(self), local_addr=(host, port)
+        )
+        return self.address
+
+    async def stop(self):
+        self._transport.close()
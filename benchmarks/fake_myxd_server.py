@@ -0,0 +1,116 @@
+"""
+Minimal MyXD cloud stub server for local benchmarks.
+
+Answers the authentication endpoints used by HTTPSClient/AsyncHTTPSClient over
+HTTP/1.1 with keep-alive:
+
+- POST /oauth/token returns an access token;
+- POST /myxdcredentials/match returns ``credentials`` matched credentials;
+- POST /myxdcredentials accepts a new credential.
+
+Supports a fixed per-request latency and failing the first ``fail_first``
+requests with 503 to exercise client retries.
+"""
+
+import asyncio
+import json
+import time
+
+DAY_MS = 86_400_000
+
+
+def build_credentials(count: int) -> list:
+    """Credentials that expire on different days, newest first."""
+    now_ms = int(time.time() * 1000)
+    return [
+        {
+            "credentialId": f"cred-{i}",
+            "username": "XDBR.105112",
+            "terminal": i + 1,
+            "authorization": f"auth-{i}",
+            "expirationDate": now_ms + (count - i) * DAY_MS,
+            "active": True,
+            "type": 1,
+        }
+        for i in range(count)
+    ]
+
+
+class FakeMyXDServer:
+    def __init__(self, latency: float = 0.0, fail_first: int = 0, credentials: int = 3):
+        self.latency = latency  # Simulated cloud time per request
+        self.fail_first = fail_first
+        self.credentials = build_credentials(credentials)
+        self.requests = 0
+        self.connections = 0
+        self._server = None
+        self._writers = set()
+
+    @property
+    def base_url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self.base_url
+
+    async def stop(self):
+        # Clients may keep idle keep-alive connections open; drop them too
+        for writer in self._writers:
+            writer.close()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                path = lines[0].split(" ")[1]
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                await self._respond(writer, path, headers)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass  # Client went away or the loop is shutting down
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, writer, path: str, headers: dict):
+        self.requests += 1
+        if self.requests <= self.fail_first:
+            self._write(writer, 503, {"error": "unavailable"})
+            await writer.drain()
+            return
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if path == "/oauth/token":
+            self._write(writer, 200, {"access_token": "stub-access-token", "expires_in": 3600})
+        elif not headers.get("authorization", "").startswith("Bearer "):
+            self._write(writer, 401, {"error": "unauthorized"})
+        elif path == "/myxdcredentials/match":
+            self._write(writer, 200, self.credentials)
+        elif path == "/myxdcredentials":
+            self._write(writer, 200, {"success": True})
+        else:
+            self._write(writer, 404, {"error": "not found"})
+        await writer.drain()
+
+    def _write(self, writer, status: int, body):
+        reasons = {200: "OK", 401: "Unauthorized", 404: "Not Found", 503: "Service Unavailable"}
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {reasons[status]}\r\nContent-Type: application/json\r\n".encode()
+            + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+            + payload
+        )
@@ -0,0 +1,128 @@
+"""
+Minimal OpenAI-compatible stub server for local benchmarks.
+
+Answers POST /v1/chat/completions over HTTP/1.1 with keep-alive, echoing the
+last user message back. Supports ``"stream": true`` (server-sent events over
+chunked transfer encoding), a fixed per-request latency, and failing the first
+``fail_first`` requests with 429 to exercise client retries.
+"""
+
+import asyncio
+import json
+import time
+
+ECHO_LIMIT = 200
+
+
+def _completion(content: str, model: str) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def _chunk(delta: dict, model: str, finish_reason=None) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+class FakeOpenAIServer:
+    def __init__(self, latency: float = 0.0, fail_first: int = 0):
+        self.latency = latency  # Simulated model time per request
+        self.fail_first = fail_first
+        self.requests = 0
+        self.connections = 0
+        self._server = None
+        self._writers = set()
+
+    @property
+    def base_url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self.base_url
+
+    async def stop(self):
+        # Clients may keep idle keep-alive connections open; drop them too
+        for writer in self._writers:
+            writer.close()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                await self._respond(writer, json.loads(body or b"{}"))
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass  # Client went away or the loop is shutting down
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, writer, request: dict):
+        self.requests += 1
+        if self.requests <= self.fail_first:
+            payload = b'{"error": {"message": "rate limited"}}'
+            writer.write(
+                b"HTTP/1.1 429 Too Many Requests\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                + payload
+            )
+            await writer.drain()
+            return
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        model = request.get("model", "stub")
+        messages = request.get("messages") or [{"content": ""}]
+        content = str(messages[-1].get("content", ""))[:ECHO_LIMIT]
+
+        if not request.get("stream"):
+            payload = json.dumps(_completion(content, model)).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                + payload
+            )
+            await writer.drain()
+            return
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        events = [_chunk({"role": "assistant", "content": ""}, model)]
+        events += [_chunk({"content": word + " "}, model) for word in content.split()]
+        events.append(_chunk({}, model, finish_reason="stop"))
+        for event in [f"data: {json.dumps(e)}\n\n" for e in events] + ["data: [DONE]\n\n"]:
+            data = event.encode()
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
@@ -0,0 +1,123 @@
+"""
+Minimal fake XD POS server for local benchmarks.
+
+Answers GETDATALIST (products and tables, honouring PART/LIMIT) and
+GETBOARDCONTENT over the [NP]key[EQ]value / [EOM] protocol.
+"""
+
+import asyncio
+import base64
+import json
+import uuid
+
+from src.utils.extractors import MessageFields
+from src.utils.frame_decoder import FrameDecoder
+
+
+def build_products(count: int):
+    return [{"id": 1000 + i, "name": f"Produto {i}"} for i in range(count)]
+
+
+def build_tables(count: int):
+    return [
+        {
+            "id": i,
+            "name": str(i),
+            "status": 1,
+            "inactive": False,
+            "freeTable": False,
+            "initialUser": 0,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def build_board(table_id: int, products, lines: int = 8):
+    content = []
+    for i in range(lines):
+        product = products[(table_id * 7 + i) % len(products)]
+        content.append(
+            {
+                "itemId": str(product["id"]),
+                "itemType": 0,
+                "parentPosition": -1,
+                "quantity": 1.0 + i % 2,
+                "price": 12.5,
+                "guid": str(uuid.uuid4()),
+                "employee": 1,
+                "time": 0,
+                "lineLevel": 0,
+                "ratio": 1,
+                "total": 12.5 * (1 + i % 2),
+                "lineDiscount": 0.0,
+                "completed": True,
+                "parentGuid": "00000000-0000-0000-0000-000000000000",
+            }
+        )
+    return {
+        "id": table_id,
+        "status": 1,
+        "tableLocation": None,
+        "content": content,
+        "total": sum(line["total"] for line in content),
+        "globalDiscount": 0.0,
+    }
+
+
+def _encode(value) -> str:
+    return base64.b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+
+class FakePOSServer:
+    def __init__(self, products: int = 5000, tables: int = 60, latency: float = 0.0):
+        self.products = build_products(products)
+        self.tables = build_tables(tables)
+        self.latency = latency  # Simulated POS processing time per message
+        self.requests = 0
+        self._server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def respond(self, message: bytes) -> bytes:
+        self.requests += 1
+        fields = MessageFields(message)
+        message_id = fields.get_str("MESSAGEID") if "MESSAGEID" in fields else ""
+        if message.startswith(b"GETDATALIST"):
+            part = int(fields.get_str("PART"))
+            limit = int(fields.get_str("LIMIT"))
+            source = (
+                self.products
+                if fields.get_str("OBJECTTYPE") == "XDPeople.Entities.MobileItem"
+                else self.tables
+            )
+            payload = source[part * limit : (part + 1) * limit]
+            body = f"GETDATALIST[NP]MESSAGEID[EQ]{message_id}[NP]OBJECT[EQ]{_encode(payload)}"
+        elif message.startswith(b"GETBOARDCONTENT"):
+            board = build_board(int(fields.get_str("BOARDID")), self.products)
+            body = f"GETBOARDCONTENT[NP]MESSAGEID[EQ]{message_id}[NP]BOARDINFO[EQ]{_encode(board)}"
+        else:
+            body = f"MESSAGEOK[NP]MESSAGEID[EQ]{message_id}"
+        return f"{body}[EOM]".encode("ascii")
+
+    async def _handle(self, reader, writer):
+        decoder = FrameDecoder()
+        try:
+            while True:
+                data = await reader.read(decoder.read_size)
+                if not data:
+                    break
+                for frame in decoder.feed(data):
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    writer.write(self.respond(frame))
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
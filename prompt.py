@@ -23,6 +23,16 @@ Caso não haja PRECO_UNITARIO, divida o PRECO_TOTAL_ITEM pela QUANTIDADE.
 {comanda}
 """
 
+# Compact variant used with pre-aggregated board lines: the schema is inlined
+# once and every line is QUANTIDADE|NOME_ITEM|PRECO_UNITARIO.
+compact_order_process_prompt = """
+Responda somente em JSON no formato:
+{{"numero_comanda": Int, "pedidos": [{{"nome_prato": String, "quantidade": Int, "preco_unitario": Float}}]}}
+Cada linha da comanda {numero_comanda} é QUANTIDADE|NOME_ITEM|PRECO_UNITARIO.
+
+{comanda}
+"""
+
 consolidate_template = """
 Resposta somente em JSON.
 
@@ -40,6 +50,15 @@ Me retorne apenas o texto da mensagem com os emojis alterados, e as casas decima
 {message}
 """
 
-order_process_prompt = PromptTemplate.from_template(order_process_prompt)
-message_enhancer_prompt = PromptTemplate.from_template(message_enhancer_prompt)
-consolidate_prompt = PromptTemplate.from_template(consolidate_template)
\ No newline at end of file
+order_process_prompt = PromptTemplate.from_template(
+    order_process_prompt, name="order_process"
+)
+compact_order_process_prompt = PromptTemplate.from_template(
+    compact_order_process_prompt, name="compact_order_process"
+)
+message_enhancer_prompt = PromptTemplate.from_template(
+    message_enhancer_prompt, name="message_enhancer"
+)
+consolidate_prompt = PromptTemplate.from_template(
+    consolidate_template, name="consolidate"
+)
\ No newline at end of file
@@ -1,12 +1,12 @@
 from models.entity_models import ComandaData
-from langchain_openai import ChatOpenAI
+from clients.model_client_registry import ModelClientRegistry
 from prompt import message_enhancer_prompt
 
 class MessageBuilder:
     def __init__(self, order: ComandaData, key: str):
         self.order = order
-        self.model = ChatOpenAI(
-            model_name="gpt-4o-mini-2024-07-18", temperature=0.0, openai_api_key=key
+        self.model = ModelClientRegistry().get_model(
+            "gpt-4o-mini-2024-07-18", key, temperature=0.0
         )
 
     def build_message(self):
@@ -0,0 +1,207 @@
+import base64
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+
+from ..config.settings import Settings
+from .retrying_transport import RetryingTransport
+
+logger = logging.getLogger(__name__)
+
+# Token and credential calls are POSTs that may have taken effect even when
+# the answer is lost, so only failures that can't have reached the handler
+# are retried: connect errors and these status codes (409 is a real conflict)
+MYXD_RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+
+class AsyncHTTPSClient:
+    """
+    Async client for the MyXD cloud authentication endpoints.
+
+    Async counterpart of HTTPSClient's HTTP calls. One pooled httpx.AsyncClient
+    is shared by every call, so keep-alive connections (and their TLS
+    sessions) are reused across token renewals. Every request has a timeout;
+    connect errors and MYXD_RETRY_STATUS_CODES are retried by the transport
+    with backoff, but a POST that timed out waiting for its answer is not.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://myxd1.azurewebsites.net",
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        max_retries: int = 2,
+        max_connections: int = 4,
+        keepalive_expiry: float = 60.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.auth_url = f"{self.base_url}/oauth/token"
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.access_token: Optional[str] = None
+        self._transport: Optional[RetryingTransport] = None
+        # Built upfront: loading the TLS context takes tens of milliseconds,
+        # better spent at startup than inside the first renewal
+        self._client: Optional[httpx.AsyncClient] = self._build_client()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "AsyncHTTPSClient":
+        """Build the client from the application settings."""
+        return cls(
+            base_url=settings.myxd_base_url,
+            timeout=settings.myxd_timeout,
+            connect_timeout=settings.myxd_connect_timeout,
+            max_retries=settings.myxd_max_retries,
+            max_connections=settings.myxd_max_connections,
+        )
+
+    def _build_client(self) -> httpx.AsyncClient:
+        self._transport = RetryingTransport(
+            httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                )
+            ),
+            max_concurrency=self.max_connections,
+            max_retries=self.max_retries,
+            retry_status_codes=MYXD_RETRY_STATUS_CODES,
+            retry_sent_posts=False,
+        )
+        return httpx.AsyncClient(
+            transport=self._transport,
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled HTTP client, rebuilt if it was closed."""
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    @property
+    def retries(self) -> int:
+        return self._transport.retries if self._transport else 0
+
+    def _bearer_headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+        }
+
+    async def authenticate(
+        self, username: str, password: str, client_id: str, client_secret: str
+    ) -> bool:
+        """Send the OAuth authentication request and store the access token."""
+        encoded_credentials = base64.b64encode(
+            f"{client_id}:{client_secret}".encode()
+        ).decode("utf-8")
+        headers = {
+            "Authorization": f"Basic {encoded_credentials}",
+            "Content-Type": "application/x-www-form-urlencoded",
+        }
+        auth_data = {
+            "username": username,
+            "password": password,
+            "client_id": client_id,
+            "grant_type": "password",
+        }
+
+        try:
+            response = await self.client.post(self.auth_url, headers=headers, data=auth_data)
+        except httpx.HTTPError as e:
+            logger.error(f"[Client] An error occurred: {e!r}")
+            return False
+
+        if response.status_code != 200:
+            logger.error(
+                f"[Client] Authentication failed with status code {response.status_code}"
+            )
+            return False
+
+        token = response.json().get("access_token")
+        if not token:
+            logger.error("[Client] Authentication failed or token not found.")
+            return False
+
+        self.access_token = token
+        logger.info("[Client] Access token received.")
+        return True
+
+    async def match_credentials(self, username: str, password: str) -> Optional[List[Dict]]:
+        """Send a request to match credentials."""
+        if not self.access_token:
+            logger.error("[Client] Error: You must authenticate first.")
+            return None
+
+        match_data = {
+            "user": username,
+            "pass": password,
+            "appType": "1",
+        }
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/myxdcredentials/match",
+                json=match_data,
+                headers=self._bearer_headers(),
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"[Client] An error occurred during credential matching: {e!r}")
+            return None
+
+        if response.status_code != 200:
+            logger.error(
+                f"[Client] Failed to match credentials with status code {response.status_code}"
+            )
+            return None
+        return response.json()
+
+    async def add_credentials(self) -> Optional[bool]:
+        """Generate new credentials and send a POST request to add them to the server."""
+        if not self.access_token:
+            logger.error("[Client] Error: You must authenticate first.")
+            return None
+
+        credentials_data = {
+            "credentialId": str(uuid.uuid4()),
+            "username": "XDBR.105112",
+            "password": "new_password",
+            "terminal": 1,
+            "authorization": uuid.uuid4().hex,
+            # Expiration date one year from now in milliseconds
+            "expirationDate": int((datetime.now() + timedelta(days=365)).timestamp() * 1000),
+            "active": False,
+            "type": 1,
+        }
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/myxdcredentials",
+                json=credentials_data,
+                headers=self._bearer_headers(),
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"[Client] An error occurred during credential addition: {e!r}")
+            return None
+
+        if response.status_code != 200:
+            logger.error(
+                f"[Client] Failed to add credentials with status code {response.status_code}"
+            )
+            return False
+        logger.info(f"[Client] Credentials {credentials_data['credentialId']} added successfully.")
+        return True
+
+    async def close(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._transport = None
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from ..utils.frame_decoder import FrameDecoder
+from ..utils.metrics import POS_CONNECT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTCPClient:
+    """
+    asyncio streams counterpart of TCPClient.
+
+    Uses the same [EOM]/MESSAGEOK framing and the same error semantics: failures
+    close the connection and make send_data return None instead of raising.
+    Responses are returned as the raw frame bytes, so large payloads reach
+    MessageFields without being decoded and re-encoded.
+    """
+
+    def __init__(
+        self, source_ip="127.0.0.1", target_ip="192.168.15.100", target_port=8978
+    ):
+        self.source_ip = source_ip
+        self.target_ip = target_ip
+        self.target_port = target_port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.read_timeout = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connected_at: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self._decoder = FrameDecoder()
+        # Set when a read left bytes of another frame unconsumed
+        self._out_of_sync = False
+        # Responses received since connecting, and bytes read for the current one
+        self.exchanges = 0
+        self._response_bytes = 0
+
+    async def __aenter__(self):
+        """Enable using the class with an 'async with' statement."""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Ensure the connection is closed when exiting the 'async with' statement."""
+        await self.close()
+
+    async def connect(self, connect_timeout=None, read_timeout=None):
+        """Establish the TCP connection."""
+        start = time.perf_counter()
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.target_ip, self.target_port),
+                connect_timeout,
+            )
+            self.read_timeout = read_timeout
+            self.loop = asyncio.get_running_loop()
+            self.connected_at = self.last_used = time.monotonic()
+            self._out_of_sync = False
+            self.exchanges = 0
+            POS_CONNECT_SECONDS.observe(time.perf_counter() - start, result="success")
+        except Exception as e:
+            POS_CONNECT_SECONDS.observe(time.perf_counter() - start, result="failure")
+            logger.debug(f"Failed to connect to {self.target_ip}: {e}")
+            self.reader = None
+            self.writer = None
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the connection is open and the server hasn't closed its side."""
+        return (
+            self.writer is not None
+            and not self.writer.is_closing()
+            and not self.reader.at_eof()
+        )
+
+    @property
+    def is_reusable(self) -> bool:
+        """
+        Check if the connection sits on a frame boundary, so the next request
+        can't receive leftovers of a previous response.
+        """
+        return (
+            self.is_connected
+            and not self._out_of_sync
+            and self._decoder.pending == 0
+        )
+
+    @property
+    def response_started(self) -> bool:
+        """Check if any bytes of the answer to the last request arrived."""
+        return self._response_bytes > 0
+
+    async def send_data(self, message: str) -> Optional[bytes]:
+        """Send ASCII-encoded message to the server."""
+        if self.writer is None:
+            return None
+        if not self.is_reusable:
+            # Whatever is left on the socket would be read as this answer
+            logger.debug("Connection is out of sync, closing it.")
+            await self.close()
+            return None
+
+        self._response_bytes = 0
+        try:
+            self.writer.write(message.encode("ascii"))
+            await self.writer.drain()
+            response = await self.receive_response()
+        except Exception as e:
+            logger.debug(f"Failed to send data: {e}")
+            await self.close()  # Close the connection on error
+            return None
+
+        self.last_used = time.monotonic()
+        if response:
+            self.exchanges += 1
+        return response
+
+    async def receive_response(self) -> Optional[bytes]:
+        """Receive data from the server and return the next complete frame."""
+        timeout_duration = self.read_timeout if self.read_timeout else 5
+        try:
+            return await asyncio.wait_for(self._read_frame(), timeout_duration)
+        except asyncio.TimeoutError:
+            await self.close()
+            return None
+        except Exception:
+            await self.close()
+            return None
+
+    async def _read_frame(self) -> bytes:
+        while True:
+            response = await self.reader.read(self._decoder.read_size)
+            self._response_bytes += len(response)
+            if not response:
+                partial = self._decoder.flush()
+                await self.close()
+                return partial
+
+            frames = self._decoder.feed(response)
+            if frames:
+                if len(frames) > 1 or self._decoder.pending:
+                    # Unsolicited data: no request is waiting for it, so it is
+                    # dropped and the connection isn't reused
+                    logger.warning(
+                        f"Discarding data received from {self.target_ip} after "
+                        f"the response."
+                    )
+                    self._out_of_sync = True
+                return frames[0]
+
+            if self._decoder.has_message_ok:
+                # The rest of this frame may still be on its way
+                self._out_of_sync = True
+                return self._decoder.flush()
+
+    async def close(self):
+        """Close the TCP connection."""
+        writer = self.writer
+        self.reader = None
+        self.writer = None
+        self._decoder.reset()
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+EOM = "[EOM]"
+
+
+def rank_credentials(
+    credentials: Iterable[Dict], preferred_id: Optional[str] = None
+) -> List[Dict]:
+    """
+    Drop expired credentials and sort the rest, newest expiration first.
+
+    The credential with ``preferred_id`` (the last one that worked) goes first.
+    """
+    now_ms = datetime.now(timezone.utc).timestamp() * 1000
+    valid = [cred for cred in credentials if cred.get("expirationDate", 0) >= now_ms]
+    valid.sort(key=lambda cred: cred.get("expirationDate", 0), reverse=True)
+    valid.sort(key=lambda cred: cred.get("credentialId") != preferred_id)
+    return valid
+
+
+class _DeviceAuthProtocol(asyncio.DatagramProtocol):
+    """Resolves ``future`` with the DeviceConfiguration answering one probe."""
+
+    def __init__(self, device_id: str, future: asyncio.Future):
+        self.device_id = device_id
+        self.future = future
+
+    def datagram_received(self, data: bytes, addr):
+        if self.future.done():
+            return
+        try:
+            response = json.loads(data.decode("utf-8").replace(EOM, ""))
+        except ValueError:
+            logger.debug(f"Ignoring malformed device auth response from {addr}.")
+            return
+        if not isinstance(response, dict):
+            return
+        device_id = response.get("deviceId", response.get("DeviceId"))
+        if device_id is not None and device_id != self.device_id:
+            return  # A late answer to another probe
+        # A reply without a token is a rejection; no point waiting any longer
+        self.future.set_result(response if response.get("Token") else None)
+
+    def error_received(self, exc: Exception):
+        logger.debug(f"Device auth probe {self.device_id} socket error: {exc}")
+
+
+class DeviceAuthProber:
+    """
+    Requests a DeviceConfiguration from the POS for many credentials at once.
+
+    Each probe sends a DeviceAuthenticationRequest over UDP from its own
+    socket, with a fresh deviceId, and only accepts a reply for that deviceId.
+    Up to ``max_concurrency`` probes run at a time, in ``rank_credentials``
+    order; the first valid configuration wins and the remaining probes are
+    cancelled. The winning credential is tried first on the next call.
+    """
+
+    def __init__(
+        self,
+        host: str = "192.168.15.100",
+        port: int = 8978,
+        timeout: float = 5.0,
+        max_concurrency: int = 4,
+        application_id: int = 1,
+        alias: str = "Coti",
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.application_id = application_id
+        self.alias = alias
+        self.last_successful_credential_id: Optional[str] = None
+        self.probes = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "DeviceAuthProber":
+        """Build the prober from the application settings."""
+        return cls(
+            host=settings.pos_host,
+            port=settings.pos_port,
+            timeout=settings.device_auth_timeout,
+            max_concurrency=settings.device_auth_concurrency,
+        )
+
+    async def probe(self, credentials: Iterable[Dict]) -> Optional[Tuple[Dict, Dict]]:
+        """
+        Return (credential, device configuration) for the first credential
+        that works, or None if none does.
+        """
+        ranked = rank_credentials(credentials, self.last_successful_credential_id)
+        if not ranked:
+            logger.warning("No unexpired credentials to probe.")
+            return None
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending = {
+            asyncio.create_task(self._probe_one(credential, semaphore)): credential
+            for credential in ranked
+        }
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    credential = pending.pop(task)
+                    device_config = task.result()
+                    if device_config:
+                        self.last_successful_credential_id = credential.get("credentialId")
+                        logger.info(
+                            f"Device configuration received with credential "
+                            f"{self.last_successful_credential_id}."
+                        )
+                        return credential, device_config
+        finally:
+            for task in pending:
+                task.cancel()
+
+        logger.error(f"None of the {len(ranked)} credentials returned a device configuration.")
+        return None
+
+    def _request(self, credential: Dict, device_id: str) -> bytes:
+        device_auth_request = {
+            "applicationId": self.application_id,
+            "authorizationCode": credential.get("authorization"),
+            "deviceId": device_id,
+            "alias": self.alias,
+        }
+        return (json.dumps(device_auth_request) + EOM).encode("utf-8")
+
+    async def _probe_one(self, credential: Dict, semaphore: asyncio.Semaphore) -> Optional[Dict]:
+        async with semaphore:
+            self.probes += 1
+            device_id = str(uuid.uuid4())
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            try:
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _DeviceAuthProtocol(device_id, future),
+                    local_addr=("0.0.0.0", 0),
+                    allow_broadcast=True,
+                )
+            except OSError as e:
+                logger.error(f"Could not open a UDP socket for device auth: {e}")
+                return None
+            try:
+                transport.sendto(self._request(credential, device_id), (self.host, self.port))
+                return await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                logger.debug(f"Credential {credential.get('credentialId')} timed out.")
+                return None
+            finally:
+                transport.close()
@@ -5,7 +5,9 @@ import json
 import uuid
 import random
 import time
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
+
+from .device_auth_prober import DeviceAuthProber
 
 
 class HTTPSClient:
@@ -22,6 +24,7 @@ class HTTPSClient:
             self.auth_url = f"{self.base_url}/oauth/token"
             self.access_token = None
             self.port = 8978
+            self.device_prober = DeviceAuthProber(host="192.168.15.100", port=self.port)
 
             # Variables to store selected credential details
             self.selected_credential_id = None
@@ -267,69 +270,32 @@ class HTTPSClient:
         print(f"[Client] No credential found with ID {credential_id}.")
         return False
 
-    from datetime import datetime, timedelta, timezone
-
-    def try_all_credentials_until_success(self, credentials):
-        """Try each credential, starting with the newest, until one returns a successful device configuration."""
-
-        # Get current UTC time as a timezone-aware datetime (current day, now)
-        current_time = datetime.now(timezone.utc)
-
-        # Filter and sort the credentials by expiration date
-        sorted_credentials = [
-            cred
-            for cred in credentials
-            # Check if the expiration date is greater than or equal to the current time
-            if datetime.fromtimestamp(
-                cred.get("expirationDate", 0) / 1000, tz=timezone.utc
-            )
-            >= current_time
-        ]
-
-        # Sort credentials by expiration date, from newest to oldest
-        sorted_credentials.sort(
-            key=lambda cred: cred.get("expirationDate", 0), reverse=True
-        )
-
-        print(f"Credentials after filtering for expiration after {current_time}:")
-
-        try:
-            for credential in sorted_credentials:
-                # Store the selected credential details in class variables
-                self.selected_credential_id = credential.get("credentialId")
-                self.selected_username = credential.get("username")
-                self.selected_terminal = credential.get("terminal")
-                self.selected_authorization = credential.get("authorization")
-                self.selected_expiration_date = credential.get("expirationDate")
-                self.selected_active = credential.get("active")
-                self.selected_type = credential.get("type")
-
-                print(f"\n[Client] Credential {self.selected_credential_id} selected:")
-                print(f"  Username         : {self.selected_username}")
-                print(f"  Terminal         : {self.selected_terminal}")
-                print(f"  Authorization    : {self.selected_authorization}")
-                print(f"  Expiration Date  : {self.selected_expiration_date}")
-                print(f"  Active           : {self.selected_active}")
-                print(f"  Type             : {self.selected_type}")
-
-                formatted_expiration_date = datetime.fromtimestamp(
-                    self.selected_expiration_date / 1000, tz=timezone.utc
-                )
-
-                # Attempt to request device configuration
-                device_config = self.request_device_configuration()
-                if device_config:
-                    print("Device configuration received:", device_config)
-                    return device_config
+    async def try_all_credentials_until_success(self, credentials):
+        """
+        Probe the unexpired credentials concurrently, starting with the last one
+        that worked, and return the first successful device configuration.
+        """
+        result = await self.device_prober.probe(credentials)
 
+        if result is None:
             print(
                 "[Client] No credentials succeeded in requesting device configuration."
             )
             return None
 
-        except KeyboardInterrupt:
-            print("\n[Client] Operation interrupted by user.")
-            return None
+        credential, device_config = result
+        # Store the selected credential details in class variables
+        self.selected_credential_id = credential.get("credentialId")
+        self.selected_username = credential.get("username")
+        self.selected_terminal = credential.get("terminal")
+        self.selected_authorization = credential.get("authorization")
+        self.selected_expiration_date = credential.get("expirationDate")
+        self.selected_active = credential.get("active")
+        self.selected_type = credential.get("type")
+
+        print(f"\n[Client] Credential {self.selected_credential_id} selected.")
+        print("Device configuration received:", device_config)
+        return device_config
 
     def select_by_latest_expiration(self, credentials):
         """Select the credential with the largest expiration date (as an integer)."""
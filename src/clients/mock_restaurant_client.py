@@ -50,6 +50,9 @@ class RestaurantMockClient:
             logger.exception("Failed to load mock tables.")
             raise
 
+    async def close(self):
+        """Mock counterpart of RestaurantClient.close; nothing is in flight."""
+
     async def load_products(self):
         """
         Mock method to simulate loading products.
@@ -0,0 +1,124 @@
+import logging
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from ..config.settings import Settings
+from .retrying_transport import RetryingTransport
+
+logger = logging.getLogger(__name__)
+
+
+class ModelClientRegistry:
+    """
+    Shared ChatOpenAI instances backed by one pooled HTTP client per (model, key).
+
+    Building a ChatOpenAI per call also builds new HTTP clients, which throws
+    away TLS sessions and keep-alive connections. The registry builds each
+    client once and hands out the same instance afterwards. Retries are done by
+    the transport, so the OpenAI SDK's own retries are disabled.
+    """
+
+    _instance: Optional["ModelClientRegistry"] = None
+    _singleton_lock = Lock()  # For thread-safe singleton implementation
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            with cls._singleton_lock:
+                if not cls._instance:
+                    cls._instance = super(ModelClientRegistry, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, "_initialized"):
+            self.base_url: Optional[str] = None
+            self.timeout = 30.0
+            self.connect_timeout = 5.0
+            self.max_retries = 3
+            self.backoff_base = 0.5
+            self.backoff_max = 8.0
+            self.max_concurrency = 8
+            self.max_connections = 20
+            self._http_clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+            self._transports: Dict[Tuple[str, str], RetryingTransport] = {}
+            self._models: Dict[Tuple[str, str, float], ChatOpenAI] = {}
+            self._initialized = True
+
+    def configure(self, settings: Settings):
+        """
+        Apply the application settings.
+
+        Settings only affect clients created afterwards, so this should run
+        before the first model is requested.
+        """
+        self.base_url = settings.openai_base_url
+        self.timeout = settings.llm_timeout
+        self.connect_timeout = settings.llm_connect_timeout
+        self.max_retries = settings.llm_max_retries
+        self.backoff_base = settings.llm_retry_backoff
+        self.backoff_max = settings.llm_retry_backoff_max
+        self.max_concurrency = settings.llm_max_concurrency
+        self.max_connections = settings.llm_max_connections
+
+    @property
+    def request_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+    def get_http_client(self, model_name: str, api_key: str) -> httpx.AsyncClient:
+        """Return the pooled async HTTP client for (model, key)."""
+        key = (model_name, api_key)
+        client = self._http_clients.get(key)
+        if client is None:
+            transport = RetryingTransport(
+                httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    )
+                ),
+                max_concurrency=self.max_concurrency,
+                max_retries=self.max_retries,
+                backoff_base=self.backoff_base,
+                backoff_max=self.backoff_max,
+            )
+            client = httpx.AsyncClient(transport=transport, timeout=self.request_timeout)
+            self._transports[key] = transport
+            self._http_clients[key] = client
+        return client
+
+    def get_model(
+        self, model_name: str, api_key: str, temperature: float = 0.0
+    ) -> ChatOpenAI:
+        """Return the shared ChatOpenAI for (model, key, temperature)."""
+        key = (model_name, api_key, temperature)
+        model = self._models.get(key)
+        if model is None:
+            model = ChatOpenAI(
+                model_name=model_name,
+                temperature=temperature,
+                openai_api_key=api_key,
+                openai_api_base=self.base_url,
+                http_async_client=self.get_http_client(model_name, api_key),
+                request_timeout=self.request_timeout,
+                max_retries=0,
+            )
+            self._models[key] = model
+        return model
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "http_clients": len(self._http_clients),
+            "models": len(self._models),
+            "retries": sum(t.retries for t in self._transports.values()),
+        }
+
+    async def close(self):
+        """Close every pooled HTTP client."""
+        clients = list(self._http_clients.values())
+        self._http_clients.clear()
+        self._transports.clear()
+        self._models.clear()
+        for client in clients:
+            await client.aclose()
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import orjson
+from pydantic import TypeAdapter
+
+from ..config.settings import Settings
+from ..models.entity_models import Product
+from ..utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_products_adapter = TypeAdapter(List[Product])
+
+
+class CatalogSnapshot:
+    """An immutable, versioned view of the product catalog."""
+
+    def __init__(self, products: Dict[str, Product], version: int, loaded_at: float):
+        self.products = products
+        self.version = version
+        self.loaded_at = loaded_at  # Wall-clock timestamp, so it survives restarts
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.loaded_at
+
+
+class ProductCache:
+    """
+    Product catalog cache with TTL, background refresh and an on-disk snapshot.
+
+    - Fresh snapshots are served directly.
+    - Snapshots older than ``ttl`` are still served, while a background refresh
+      replaces them (stale-while-revalidate).
+    - An unknown product ID triggers a reload, at most once every
+      ``miss_refresh_interval`` seconds; concurrent reloads are coalesced.
+    - Every loaded catalog is persisted to ``snapshot_path`` so a cold start can
+      serve the last known catalog instead of waiting for the POS.
+    """
+
+    REFRESH_KEY = "catalog"
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[Dict[str, Product]]],
+        ttl: float = 300.0,
+        miss_refresh_interval: float = 30.0,
+        snapshot_path: Optional[str] = os.path.join("cache", "products.json"),
+    ):
+        self._loader = loader
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self.snapshot_path = snapshot_path
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._single_flight = SingleFlight()
+        self._background_refresh: Optional[asyncio.Task] = None
+        self._last_miss_refresh = 0.0
+        self.load_snapshot()
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, loader: Callable[[], Awaitable[Dict[str, Product]]]
+    ) -> "ProductCache":
+        """Build the cache from the application settings."""
+        return cls(
+            loader=loader,
+            ttl=settings.product_cache_ttl,
+            miss_refresh_interval=settings.product_cache_miss_refresh_interval,
+            snapshot_path=settings.product_cache_snapshot_path,
+        )
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    @property
+    def products(self) -> Dict[str, Product]:
+        return self._snapshot.products if self._snapshot else {}
+
+    def is_stale(self) -> bool:
+        return self._snapshot is None or self._snapshot.age > self.ttl
+
+    async def get(self, product_id: str) -> Optional[Product]:
+        """Return a product by ID, refreshing the catalog if needed."""
+        if self._snapshot is None:
+            await self.refresh()
+        elif self.is_stale():
+            self._schedule_background_refresh()
+
+        product = self.products.get(product_id)
+        if product is None and self._can_refresh_on_miss():
+            logger.info(f"Product {product_id} not in catalog, reloading.")
+            self._last_miss_refresh = time.monotonic()
+            await self.refresh()
+            product = self.products.get(product_id)
+        return product
+
+    def _can_refresh_on_miss(self) -> bool:
+        if self._single_flight.in_flight(self.REFRESH_KEY):
+            return True  # Joining a running reload costs nothing
+        return time.monotonic() - self._last_miss_refresh > self.miss_refresh_interval
+
+    async def refresh(self) -> CatalogSnapshot:
+        """Reload the catalog, sharing the reload with any concurrent caller."""
+        return await self._single_flight.do(self.REFRESH_KEY, self._reload)
+
+    def _schedule_background_refresh(self):
+        if self._background_refresh is None or self._background_refresh.done():
+            logger.debug("Product catalog is stale, refreshing in the background.")
+            self._background_refresh = asyncio.ensure_future(self._refresh_quietly())
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Background product refresh failed: {e}", exc_info=True)
+
+    async def _reload(self) -> CatalogSnapshot:
+        products = await self._loader()
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        self._snapshot = CatalogSnapshot(products, version, time.time())
+        logger.info(
+            f"Product catalog version {version} loaded with {len(products)} items."
+        )
+        if self.snapshot_path:
+            await asyncio.to_thread(self._save_snapshot, self._snapshot)
+        return self._snapshot
+
+    def _save_snapshot(self, snapshot: CatalogSnapshot):
+        """Persist a snapshot atomically, so readers never see a partial file."""
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            data = orjson.dumps(
+                {
+                    "version": snapshot.version,
+                    "loaded_at": snapshot.loaded_at,
+                    "products": [p.model_dump() for p in snapshot.products.values()],
+                }
+            )
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.error(f"Failed to persist product snapshot: {e}")
+
+    def load_snapshot(self) -> bool:
+        """Load the persisted snapshot, if there is one."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                data = orjson.loads(f.read())
+            products = _products_adapter.validate_python(data["products"])
+            self._snapshot = CatalogSnapshot(
+                {str(product.id): product for product in products},
+                data["version"],
+                data["loaded_at"],
+            )
+            logger.info(
+                f"Loaded product snapshot version {self._snapshot.version} "
+                f"with {len(products)} items."
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to load product snapshot: {e}")
+            return False
@@ -1,15 +1,18 @@
 import asyncio
 import uuid
-import base64
-import json
 import time
 import logging
-from typing import Dict, List, Type, Optional
+from typing import AsyncIterator, Dict, List, Set, Type, Optional
 from fastapi import HTTPException
+from ..config.settings import Settings
 from .token_manager import TokenManager
-from .tcp_client import TCPClient
+from .product_cache import ProductCache
+from .table_content_cache import TableContentCache
+from .tcp_connection_pool import TCPConnectionPool
 from ..builders.pos_message_builder import MessageBuilder
 from ..models.entity_models import Product, Table
+from ..utils.decoders import decode_base64_json, decode_base64_model_list
+from ..utils.extractors import MessageFields
 
 # Configure the logger
 logger = logging.getLogger("RestaurantClient")
@@ -40,65 +43,138 @@ class RestaurantClient:
     APP_VERSION: str = "1.0"
     PROTOCOL_VERSION: str = "1"
     TOKEN: str = ""
-    LIMIT: int = 5000
+    LIMIT: int = 1000  # Items requested per GETDATALIST part
 
     message_builder: MessageBuilder
-    products: Dict[str, Product]
+    product_cache: ProductCache
     token_manager: TokenManager
-
-    def __new__(cls, token_manager: TokenManager):
+    connection_pool: TCPConnectionPool
+    table_content_cache: TableContentCache
+    _prefetches: Set[asyncio.Task]
+
+    def __new__(
+        cls,
+        token_manager: TokenManager,
+        connection_pool: Optional[TCPConnectionPool] = None,
+        table_content_cache: Optional[TableContentCache] = None,
+        settings: Optional[Settings] = None,
+    ):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance.products = {}
+            cls._instance.product_cache = ProductCache.from_settings(
+                settings or Settings(), loader=cls._instance._load_product_catalog
+            )
             cls._instance.message_builder = MessageBuilder(
                 user_id=cls.USER_ID,
                 app_version=cls.APP_VERSION,
                 protocol_version=cls.PROTOCOL_VERSION,
             )
             cls._instance.token_manager = token_manager
+            cls._instance.connection_pool = connection_pool or TCPConnectionPool()
+            cls._instance.table_content_cache = (
+                table_content_cache or TableContentCache()
+            )
+            # Requests sent past the end of a data list, awaited by close()
+            cls._instance._prefetches = set()
             logger.debug("RestaurantClient instance created.")
         return cls._instance
 
-    def __init__(self, token_manager: TokenManager):
-        if not self.products:
-            logger.debug("Initializing product cache.")
-            asyncio.run(self.load_products())
+    def __init__(
+        self,
+        token_manager: TokenManager,
+        connection_pool: Optional[TCPConnectionPool] = None,
+        table_content_cache: Optional[TableContentCache] = None,
+        settings: Optional[Settings] = None,
+    ):
+        # The catalog is warmed up at application startup (see app.lifespan);
+        # until then lookups use the persisted snapshot or load it on demand.
         self.token_manager: TokenManager = token_manager
 
+    @property
+    def products(self) -> Dict[str, Product]:
+        return self.product_cache.products
+
     async def load_products(self):
-        """Load products and store them in the cache."""
+        """Reload the product catalog into the cache."""
         logger.info("Loading products into cache.")
         try:
-            products = await self._fetch_data_list(
-                object_type="XDPeople.Entities.MobileItem", model_class=Product
-            )
-            self.products = {str(product.id): product for product in products}
-            logger.info(f"Product cache initialized with {len(self.products)} items.")
+            await self.product_cache.refresh()
         except Exception as e:
             logger.error(f"Failed to load products: {e}", exc_info=True)
             raise
 
+    async def _load_product_catalog(self) -> Dict[str, Product]:
+        """Fetch the whole product catalog from the POS."""
+        products: Dict[str, Product] = {}
+        async for batch in self.iter_data_list(
+            object_type="XDPeople.Entities.MobileItem", model_class=Product
+        ):
+            products.update((str(product.id), product) for product in batch)
+        return products
+
     async def _fetch_product(self, product_id: str) -> Optional[Product]:
         """Fetch a product from the cache by ID, reloading if necessary."""
-        if not self.products:
-            logger.warning("Product cache is empty. Attempting to reload products.")
-            try:
-                await self.load_products()
-            except Exception as e:
-                logger.error(f"Failed to reload products: {e}", exc_info=True)
-                return None
-
-        product = self.products.get(product_id)
+        try:
+            product = await self.product_cache.get(product_id)
+        except Exception as e:
+            logger.error(f"Failed to reload products: {e}", exc_info=True)
+            return None
+
         if not product:
             logger.warning(f"Product not found in cache for product_id: {product_id}")
         return product
 
-    async def _fetch_data_list(self, object_type: str, model_class: Type) -> List:
-        """Generic method to fetch a list of data from the server via TCP."""
+    async def iter_data_list(
+        self, object_type: str, model_class: Type, limit: Optional[int] = None
+    ) -> AsyncIterator[List]:
+        """
+        Walk the GETDATALIST parts of an object type until they are exhausted.
+
+        Yields one typed batch per part. The request for the next part is sent
+        as soon as the raw frame of the current one arrives, so it travels over
+        the network while the current part is decoded and consumed. A part
+        shorter than the limit is the last one; the request already sent past
+        it finishes in the background (``close`` waits for it) and its answer
+        is dropped.
+        """
+        limit = limit or self.LIMIT
+        part = 0
+        request = asyncio.create_task(self._request_data_list(object_type, part, limit))
+        try:
+            while True:
+                response = await request
+                request = asyncio.create_task(
+                    self._request_data_list(object_type, part + 1, limit)
+                )
+                # Let the next request reach the socket before decoding
+                await asyncio.sleep(0)
+                batch = await self._decode_data_list(
+                    response, object_type, model_class, part
+                )
+                if batch:
+                    yield batch
+                if len(batch) < limit:
+                    return
+                part += 1
+        finally:
+            # Not cancelled: interrupting a send would cost the pooled connection
+            if not request.done():
+                self._prefetches.add(request)
+                request.add_done_callback(self._prefetches.discard)
+            # Retrieve the outcome so a failed request isn't logged as unhandled
+            request.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def close(self):
+        """Wait for the data list requests still in flight, e.g. on shutdown."""
+        if self._prefetches:
+            await asyncio.gather(*self._prefetches, return_exceptions=True)
+
+    async def _request_data_list(self, object_type: str, part: int, limit: int) -> bytes:
+        """Send the GETDATALIST request for one part and return the raw frame."""
         message = await self.message_builder.build_get_data_list(
             object_type=object_type,
-            part=0,
-            limit=self.LIMIT,
+            part=part,
+            limit=limit,
             message_id=str(uuid.uuid4()),
         )
         response = await self._send_message(message)
@@ -107,64 +183,79 @@ class RestaurantClient:
             raise HTTPException(
                 status_code=500, detail="Failed to receive response from the TCP server"
             )
+        return response
 
+    async def _decode_data_list(
+        self, response: bytes, object_type: str, model_class: Type, part: int
+    ) -> List:
+        """Decode the OBJECT list of one GETDATALIST part."""
         try:
-            encoded_object = self._extract_field(response, "[NP]OBJECT[EQ]")
-            decoded_json = self._decode_base64_json(encoded_object)
-            return [model_class(**item) for item in decoded_json]
-        except ValueError as e:
-            # Verifica se a exceção diz respeito ao campo "[NP]OBJECT[EQ]" não encontrado
-            if "No NP]OBJECT[EQ field found in the response" in str(e):
-                # Marca o token como não autenticado
-                await self.token_manager.set_unauthenticated()
-                raise HTTPException(
-                    status_code=401,
-                    detail="Authentication error: token expired or invalid",
-                )
-            # Se não for esse caso específico, trata como erro genérico
+            encoded_object = self._extract_field(response, "OBJECT")
+        except ValueError:
+            if part > 0:
+                # A list whose size is a multiple of the limit ends with a
+                # request past the last part, which may come back without data
+                logger.debug(f"No OBJECT in part {part} of {object_type}, end of list.")
+                return []
+            # Marca o token como não autenticado
+            await self.token_manager.set_unauthenticated()
             raise HTTPException(
-                status_code=500,
-                detail=f"Failed to decode or process the response: {str(e)}",
+                status_code=401,
+                detail="Authentication error: token expired or invalid",
             )
+        if part > 0 and not encoded_object:
+            return []
+
+        try:
+            return decode_base64_model_list(encoded_object, model_class)
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to decode or process the response: {str(e)}",
             )
 
-    async def _send_message(self, message: str) -> Optional[str]:
-        """Send a message to the TCP server and return the response."""
+    async def _send_message(self, message: str) -> Optional[bytes]:
+        """Send a message to the TCP server and return the raw response frame."""
         logger.debug(f"Sending message to TCP server: {message}")
-        with TCPClient() as client:
-            loop = asyncio.get_event_loop()
-            try:
-                response = await loop.run_in_executor(None, client.send_data, message)
-                logger.debug(f"Received response: {response}")
-
-                if self._is_authentication_error(response):
-                    logger.warning("Authentication error detected in response.")
-                    await self.token_manager.set_unauthenticated()
-                    raise HTTPException(
-                        status_code=401,
-                        detail="Authentication error: token expired or invalid",
-                    )
-                return response
-            except Exception as e:
-                logger.error(f"Failed to send message: {e}", exc_info=True)
+        try:
+            response = await self.connection_pool.send_data(message)
+            logger.debug(
+                f"Received response: {len(response) if response else 0} bytes"
+            )
+
+            if self._is_authentication_error(response):
+                logger.warning("Authentication error detected in response.")
                 await self.token_manager.set_unauthenticated()
                 raise HTTPException(
-                    status_code=500, detail=f"Failed to send message: {e}"
+                    status_code=401,
+                    detail="Authentication error: token expired or invalid",
                 )
+            return response
+        except Exception as e:
+            logger.error(f"Failed to send message: {e}", exc_info=True)
+            await self.token_manager.set_unauthenticated()
+            raise HTTPException(status_code=500, detail=f"Failed to send message: {e}")
 
-    def _is_authentication_error(self, response: str) -> bool:
+    def _is_authentication_error(self, response: Optional[bytes]) -> bool:
         """Check if the response indicates an authentication error."""
-        auth_error = "AuthError" in response  # Replace with actual auth error indicator
+        auth_error = response is not None and b"AuthError" in response  # Replace with actual auth error indicator
         if auth_error:
             logger.debug("Authentication error found in response.")
         return auth_error
 
     async def fetch_table_content(self, table_id: int) -> Dict:
-        """Fetch content for a specific table and enrich it with product names."""
+        """
+        Fetch content for a specific table and enrich it with product names.
+
+        Concurrent calls for the same table share one POS request, and the
+        result is briefly cached (see TableContentCache).
+        """
+        return await self.table_content_cache.get(
+            table_id, lambda: self._fetch_table_content(table_id)
+        )
+
+    async def _fetch_table_content(self, table_id: int) -> Dict:
+        """Fetch the content of a table from the POS."""
         logger.info(f"Fetching content for table ID: {table_id}")
         try:
             message = await self.message_builder.build_get_board_content(
@@ -181,9 +272,7 @@ class RestaurantClient:
                     detail="Failed to receive response from the TCP server",
                 )
 
-            table_content = self._extract_and_decode_field(
-                response, "[NP]BOARDINFO[EQ]"
-            )
+            table_content = self._extract_and_decode_field(response, "BOARDINFO")
             logger.debug(f"Raw table content: {table_content}")
 
             # Call the enriched method (updated to use _fetch_product)
@@ -196,12 +285,11 @@ class RestaurantClient:
                 status_code=500, detail=f"Failed to fetch table content: {str(e)}"
             )
 
-    def _extract_and_decode_field(self, response: str, field_identifier: str) -> Dict:
+    def _extract_and_decode_field(self, response: bytes, field_key: str) -> Dict:
         """Extract and decode a Base64 encoded field from the response."""
-        logger.debug(f"Extracting field '{field_identifier}' from response.")
-        encoded_field = self._extract_field(response, field_identifier)
-        decoded = self._decode_base64_json(encoded_field)
-        logger.debug(f"Decoded field '{field_identifier}': {decoded}")
+        encoded_field = self._extract_field(response, field_key)
+        decoded = decode_base64_json(encoded_field)
+        logger.debug(f"Decoded field '{field_key}': {decoded}")
         return decoded
 
     async def _enrich_table_content_with_product_names(self, table_content: Dict):
@@ -221,9 +309,11 @@ class RestaurantClient:
         """Fetch a list of tables from the server via TCP."""
         logger.info("Fetching list of tables.")
         try:
-            tables = await self._fetch_data_list(
+            tables: List[Table] = []
+            async for batch in self.iter_data_list(
                 object_type="XDPeople.Entities.MobileBoardStatus", model_class=Table
-            )
+            ):
+                tables.extend(batch)
             logger.info(f"Fetched {len(tables)} tables.")
             return tables
         except Exception as e:
@@ -258,6 +348,8 @@ class RestaurantClient:
                     detail="Failed to receive response from the TCP server",
                 )
 
+            self.table_content_cache.invalidate(table_id)
+            response = response.decode("ascii")
             logger.info(f"Prebill response for table ID {table_id}: {response}")
             return response
         except Exception as e:
@@ -285,6 +377,8 @@ class RestaurantClient:
                     detail="Failed to receive response from the TCP server",
                 )
 
+            self.table_content_cache.invalidate(table_id)
+            response = response.decode("ascii")
             logger.info(f"Close table response for table ID {table_id}: {response}")
             return response
         except Exception as e:
@@ -294,41 +388,12 @@ class RestaurantClient:
             )
 
     @staticmethod
-    def _extract_field(response: str, field_identifier: str) -> str:
-        """Extract a Base64 encoded field from the response."""
-        logger.debug(f"Extracting field '{field_identifier}' from response.")
-        start = response.find(field_identifier)
-        if start == -1:
-            error_msg = f"No {field_identifier.strip('[').strip(']')} field found in the response"
+    def _extract_field(response: bytes, field_key: str) -> memoryview:
+        """Extract the raw value of a field from the response."""
+        logger.debug(f"Extracting field '{field_key}' from response.")
+        encoded_field = MessageFields(response).get(field_key)
+        if encoded_field is None:
+            error_msg = f"No {field_key} field found in the response"
             logger.error(error_msg)
             raise ValueError(error_msg)
-
-        encoded_field = response[start + len(field_identifier) :]
-        end = (
-            encoded_field.find("[NP]")
-            if "[NP]" in encoded_field
-            else encoded_field.find("[EOM]")
-        )
-        if end == -1:
-            error_msg = f"End of {field_identifier.strip('[').strip(']')} field not found in the response"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-
-        extracted = encoded_field[:end].strip()
-        logger.debug(f"Extracted encoded field: {extracted}")
-        return extracted
-
-    @staticmethod
-    def _decode_base64_json(encoded_str: str) -> Dict:
-        """Decode a Base64 encoded JSON string into a dictionary."""
-        logger.debug("Decoding Base64 JSON string.")
-        try:
-            decoded_bytes = base64.b64decode(encoded_str)
-            decoded_str = decoded_bytes.decode("utf-8")
-            decoded_json = json.loads(decoded_str)
-            logger.debug(f"Decoded JSON: {decoded_json}")
-            return decoded_json
-        except Exception as e:
-            error_msg = f"Error during Base64 decoding or JSON parsing: {e}"
-            logger.error(error_msg, exc_info=True)
-            raise ValueError(error_msg)
+        return encoded_field
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import random
+from typing import Iterable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Failures that happen before the request reaches the server
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its concurrency slot once it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, semaphore: asyncio.Semaphore):
+        self._stream = stream
+        self._semaphore = semaphore
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._semaphore.release()
+
+
+class RetryingTransport(httpx.AsyncBaseTransport):
+    """
+    Transport that limits concurrent requests and retries transient failures.
+
+    At most ``max_concurrency`` requests are in flight; a slot is held until
+    the response body is closed, so streamed completions count as well.
+    Connection errors, timeouts and ``retry_status_codes`` are retried up to
+    ``max_retries`` times with full-jitter exponential backoff, honouring a
+    numeric ``Retry-After`` header when the server sends one. With
+    ``retry_sent_posts=False``, a POST is only retried when it never reached
+    the server (connect errors), not after a read timeout or dropped
+    connection, where the server may already have acted on it.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        retry_status_codes: Iterable[int] = RETRY_STATUS_CODES,
+        retry_sent_posts: bool = True,
+    ):
+        self._transport = transport
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_status_codes = frozenset(retry_status_codes)
+        self.retry_sent_posts = retry_sent_posts
+        self.retries = 0
+
+    def _can_retry_error(self, request: httpx.Request, error: Exception) -> bool:
+        return (
+            self.retry_sent_posts
+            or request.method != "POST"
+            or isinstance(error, _UNSENT_ERRORS)
+        )
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("retry-after", 0)))
+            except ValueError:
+                pass  # HTTP-date values are not worth parsing here
+        return min(delay, self.backoff_max)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self._semaphore.acquire()
+        try:
+            response = await self._send_with_retries(request)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, self._semaphore)
+        return response
+
+    async def _send_with_retries(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.TimeoutException, httpx.RemoteProtocolError) as e:
+                if attempt >= self.max_retries or not self._can_retry_error(request, e):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"Request to {request.url.host} failed ({e!r}), "
+                    f"retrying in {delay:.2f}s."
+                )
+            else:
+                if (
+                    response.status_code not in self.retry_status_codes
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                delay = self._backoff(attempt, response)
+                await response.aclose()
+                logger.warning(
+                    f"Request to {request.url.host} returned {response.status_code}, "
+                    f"retrying in {delay:.2f}s."
+                )
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
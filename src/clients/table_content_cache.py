@@ -0,0 +1,87 @@
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Tuple
+
+from ..config.settings import Settings
+from ..utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class TableContentCache:
+    """
+    Request coalescing and a short micro-cache for GETBOARDCONTENT lookups.
+
+    Concurrent lookups for the same table share one POS request, and the result
+    is reused for ``ttl`` seconds. Cached board contents are shared between
+    callers and must be treated as read-only.
+
+    ``invalidate`` bumps a per-table generation: fetches started before it are
+    neither stored nor joined by later lookups, so a board read before a
+    POSTQUEUE can't be served after it.
+    """
+
+    def __init__(self, ttl: float = 1.0):
+        self.ttl = ttl
+        self._entries: Dict[int, Tuple[float, Dict]] = {}
+        self._generations: Dict[int, int] = {}
+        self._single_flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "TableContentCache":
+        """Build the cache from the application settings."""
+        return cls(ttl=settings.table_content_cache_ttl)
+
+    async def get(self, table_id: int, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        """
+        Return the content of a table, fetching it only if needed.
+
+        Args:
+            table_id (int): The table to look up.
+            fetch (Callable[[], Awaitable[Dict]]): Fetches the content from the POS.
+
+        Returns:
+            Dict: The table content.
+        """
+        entry = self._entries.get(table_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        generation = self._generations.get(table_id, 0)
+        key = (table_id, generation)
+        if self._single_flight.in_flight(key):
+            self.coalesced += 1
+            logger.debug(f"Joining in-flight content request for table {table_id}.")
+        else:
+            self.misses += 1
+        return await self._single_flight.do(
+            key, lambda: self._load(table_id, generation, fetch)
+        )
+
+    async def _load(
+        self, table_id: int, generation: int, fetch: Callable[[], Awaitable[Dict]]
+    ) -> Dict:
+        content = await fetch()
+        if self.ttl > 0 and self._generations.get(table_id, 0) == generation:
+            self._entries[table_id] = (time.monotonic() + self.ttl, content)
+        return content
+
+    def invalidate(self, table_id: int):
+        """
+        Drop the cached content of a table, e.g. after posting to its queue,
+        and keep fetches already in flight from storing their older result.
+        """
+        self._entries.pop(table_id, None)
+        self._generations[table_id] = self._generations.get(table_id, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "cached_tables": len(self._entries),
+        }
@@ -3,26 +3,28 @@ import signal
 import sys
 import time
 
+from ..utils.frame_decoder import FrameDecoder
+
 
 class TCPClient:
-    _instance = None  # Class-level attribute to hold the singleton instance
+    """
+    A single TCP connection to the POS server.
 
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super(TCPClient, cls).__new__(cls)
-        return cls._instance
+    Each instance owns its own socket, so concurrent callers must each create
+    (or borrow from a pool) their own client instead of sharing one.
+    """
 
     def __init__(
         self, source_ip="127.0.0.1", target_ip="192.168.15.100", target_port=8978
     ):
-        # Initialize only once
-        if not hasattr(self, '_initialized'):
-            self.source_ip = source_ip
-            self.target_ip = target_ip
-            self.target_port = target_port
-            self.client_socket = None
-            self.read_timeout = None  # Initialize read_timeout attribute
-            self._initialized = True  # Flag to prevent re-initialization
+        self.source_ip = source_ip
+        self.target_ip = target_ip
+        self.target_port = target_port
+        self.client_socket = None
+        self.read_timeout = None  # Initialize read_timeout attribute
+        self._decoder = FrameDecoder()
+        # Set when a read left bytes of another frame unconsumed
+        self._out_of_sync = False
 
     def __enter__(self):
         """Enable using the class with a 'with' statement."""
@@ -40,12 +42,22 @@ class TCPClient:
             if connect_timeout is not None:
                 self.client_socket.settimeout(connect_timeout)
             self.client_socket.connect((self.target_ip, self.target_port))
+            self._out_of_sync = False
             self.read_timeout = read_timeout  # Store read_timeout for use in receive_response
             if read_timeout is not None:
                 self.client_socket.settimeout(read_timeout)
         except Exception as e:
             self.client_socket = None
 
+    @property
+    def is_reusable(self):
+        """Check if the connection sits on a frame boundary, ready for another request."""
+        return (
+            self.client_socket is not None
+            and not self._out_of_sync
+            and self._decoder.pending == 0
+        )
+
     def create_socket(self):
         """Create a TCP socket."""
         return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -55,6 +67,10 @@ class TCPClient:
         """Send ASCII-encoded message to the server."""
         if self.client_socket is None:
             return None
+        if not self.is_reusable:
+            # Whatever is left on the socket would be read as this answer
+            self.close()
+            return None
 
         try:
             self.client_socket.sendall(message.encode("ascii"))
@@ -64,8 +80,7 @@ class TCPClient:
             return None
 
     def receive_response(self):
-        """Receive data from the server and return the full response."""
-        full_response = ""
+        """Receive data from the server and return the next complete frame."""
         start_time = time.time()  # Record the start time
         timeout_duration = self.read_timeout if self.read_timeout else 5  # Default to 5 seconds if not set
         try:
@@ -75,17 +90,24 @@ class TCPClient:
                     self.close()
                     return None
 
-                response = self.client_socket.recv(1024)
+                response = self.client_socket.recv(self._decoder.read_size)
                 if not response:
+                    partial = self._decoder.flush()
                     self.close()
-                    break
-
-                response_str = response.decode("ascii")
-                full_response += response_str
-
-                if self.is_end_of_message(full_response):
-                    break
-            return full_response
+                    return partial.decode("ascii")
+
+                frames = self._decoder.feed(response)
+                if frames:
+                    if len(frames) > 1 or self._decoder.pending:
+                        # Unsolicited data: no request is waiting for it, so
+                        # it is dropped and the connection isn't reused
+                        self._out_of_sync = True
+                    return frames[0].decode("ascii")
+
+                if self._decoder.has_message_ok:
+                    # The rest of this frame may still be on its way
+                    self._out_of_sync = True
+                    return self._decoder.flush().decode("ascii")
         except socket.timeout:
             self.close()
             return None
@@ -93,15 +115,13 @@ class TCPClient:
             self.close()
             return None
 
-    def is_end_of_message(self, response: str) -> bool:
-        """Check if the end-of-message marker is reached."""
-        return response.endswith("[EOM]") or "MESSAGEOK" in response
-
     def close(self):
         """Close the TCP connection."""
         if self.client_socket:
             self.client_socket.close()
             self.client_socket = None
+        self._decoder.reset()
+        self._out_of_sync = False
 
 
 def signal_handler(sig, frame):
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+from .async_tcp_client import AsyncTCPClient
+from ..config.settings import Settings
+from ..utils.extractors import extract_message_id
+from ..utils.metrics import POS_POOL_WAIT_SECONDS, POS_ROUND_TRIP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class TCPConnectionPool:
+    """
+    Keeps warm TCP connections to the XD POS server and hands them out per request.
+
+    Connections are discarded when they exceed ``max_lifetime``, sit idle for longer
+    than ``idle_timeout``, or fail the health check at checkout. A connection whose
+    last response was not read up to a frame boundary, or was not the answer to its
+    request, is closed instead of being returned. At most ``size`` connections are
+    in use at the same time.
+
+    There is no reaper task: expired idle connections are closed the next time a
+    connection is checked out or returned. The POS may also drop an idle
+    connection at any moment, so a request that fails on a reused connection
+    before any response bytes arrive is retried once on a new connection.
+    """
+
+    def __init__(
+        self,
+        target_ip: str = "192.168.15.100",
+        target_port: int = 8978,
+        size: int = 4,
+        idle_timeout: float = 30.0,
+        max_lifetime: float = 300.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 5.0,
+    ):
+        self.target_ip = target_ip
+        self.target_port = target_port
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._idle: Deque[AsyncTCPClient] = deque()
+        self._semaphore = asyncio.Semaphore(size)
+        self._closed = False
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "TCPConnectionPool":
+        """Build a pool from the application settings."""
+        return cls(
+            target_ip=settings.pos_host,
+            target_port=settings.pos_port,
+            size=settings.pos_pool_size,
+            idle_timeout=settings.pos_pool_idle_timeout,
+            max_lifetime=settings.pos_pool_max_lifetime,
+            connect_timeout=settings.pos_connect_timeout,
+            read_timeout=settings.pos_read_timeout,
+        )
+
+    async def _open_connection(self) -> AsyncTCPClient:
+        """Open a new connection to the POS server."""
+        conn = AsyncTCPClient(target_ip=self.target_ip, target_port=self.target_port)
+        await conn.connect(
+            connect_timeout=self.connect_timeout, read_timeout=self.read_timeout
+        )
+        if conn.is_connected:
+            logger.debug(
+                f"Opened pooled connection to {self.target_ip}:{self.target_port}."
+            )
+        return conn
+
+    def _is_healthy(self, conn: AsyncTCPClient) -> bool:
+        """Check whether an idle connection can still be reused."""
+        now = time.monotonic()
+        if not conn.is_connected:
+            return False
+        if conn.loop is not asyncio.get_running_loop():
+            return False
+        if now - conn.connected_at > self.max_lifetime:
+            return False
+        if now - conn.last_used > self.idle_timeout:
+            return False
+        return True
+
+    async def _reap_idle(self):
+        """Close the idle connections that can no longer be reused."""
+        stale = [conn for conn in self._idle if not self._is_healthy(conn)]
+        for conn in stale:
+            self._idle.remove(conn)
+            logger.debug("Discarding stale pooled connection.")
+            await conn.close()
+
+    async def _checkout(self, fresh: bool = False) -> AsyncTCPClient:
+        """
+        Return a healthy idle connection, opening a new one if none is left or
+        ``fresh`` is set.
+        """
+        await self._reap_idle()
+        while self._idle and not fresh:
+            conn = self._idle.pop()
+            if self._is_healthy(conn):
+                return conn
+            logger.debug("Discarding stale pooled connection.")
+            await conn.close()
+        return await self._open_connection()
+
+    async def _checkin(self, conn: AsyncTCPClient):
+        """Return a connection to the pool, or close it if it can't be reused."""
+        if self._closed or not conn.is_reusable or len(self._idle) >= self.size:
+            await conn.close()
+            return
+        self._idle.append(conn)
+        await self._reap_idle()
+
+    @asynccontextmanager
+    async def acquire(self, fresh: bool = False) -> AsyncIterator[AsyncTCPClient]:
+        """
+        Borrow a connection from the pool for the duration of the block; with
+        ``fresh``, a newly opened one.
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed.")
+
+        start = time.perf_counter()
+        async with self._semaphore:
+            conn = await self._checkout(fresh)
+            POS_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+            try:
+                yield conn
+            except BaseException:
+                await conn.close()
+                raise
+            await self._checkin(conn)
+
+    async def send_data(self, message: str) -> Optional[bytes]:
+        """Send a message over a pooled connection and return the response."""
+        message_type = message.split("[NP]", 1)[0]
+        response, retryable = await self._exchange(message, message_type)
+        if retryable:
+            # The POS dropped the idle connection before reading the request
+            logger.debug("Pooled connection failed before answering, retrying once.")
+            response, _ = await self._exchange(message, message_type, fresh=True)
+        return response
+
+    async def _exchange(
+        self, message: str, message_type: str, fresh: bool = False
+    ) -> Tuple[Optional[bytes], bool]:
+        """
+        Send a message and read its answer on one connection.
+
+        Also returns whether a failure may be retried: the connection was
+        reused and no byte of the answer arrived.
+        """
+        async with self.acquire(fresh) as conn:
+            reused = conn.exchanges > 0
+            with POS_ROUND_TRIP_SECONDS.time(message_type=message_type):
+                response = await conn.send_data(message)
+            if not response:
+                return None, reused and not conn.response_started
+            request_id = extract_message_id(message)
+            response_id = extract_message_id(response)
+            if request_id and response_id and request_id != response_id:
+                logger.warning(
+                    f"Response MESSAGEID {response_id} doesn't match request "
+                    f"{request_id}, dropping the connection."
+                )
+                await conn.close()
+                return None, False
+            return response, False
+
+    async def close(self):
+        """Close every idle connection and refuse new checkouts."""
+        self._closed = True
+        while self._idle:
+            await self._idle.pop().close()
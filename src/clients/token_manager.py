@@ -1,10 +1,14 @@
 import asyncio
-from http.client import HTTPException
 import time
 import random
 from typing import Optional
 from threading import Lock
-from .https_client import HTTPSClient
+from fastapi import HTTPException
+from .async_https_client import AsyncHTTPSClient
+from .device_auth_prober import DeviceAuthProber
+from .token_state_persister import TokenStatePersister
+from ..config.settings import Settings
+from ..utils.metrics import TOKEN_REFRESH_EVENTS, TOKEN_REFRESH_SECONDS
 import logging
 from datetime import datetime, timedelta
 import json
@@ -26,87 +30,131 @@ class TokenManager:
                     cls._instance = super(TokenManager, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self, use_mock: bool = False, url: str = "http://localhost:8001"):
+    def __init__(
+        self,
+        use_mock: bool = False,
+        url: str = "http://localhost:8001",
+        refresh_fraction: float = 0.8,
+        https_client: Optional[AsyncHTTPSClient] = None,
+        device_prober: Optional[DeviceAuthProber] = None,
+    ):
         if not hasattr(self, "_initialized"):
             self.token: Optional[str] = None
             self.token_expiration: Optional[float] = None  # Use float para timestamp
+            self.token_issued_at: Optional[float] = None
             self.state = "Authenticated" if self.token else "Unauthenticated"
-            self.token_lock = asyncio.Lock()  # For async token access
             self.use_mock = use_mock
+            self.refresh_fraction = refresh_fraction  # Renew at this share of the lifetime
             self._url = url
+            self._https_client = https_client
+            self._device_prober = device_prober
+            # The authentication in flight, shared by every caller that needs it
+            self._renewal: Optional[asyncio.Future] = None
+            self._background_refresh: Optional[asyncio.Task] = None
+            self._token_available = asyncio.Event()
             self._state_file = "token_manager_state.json"  # Nome do arquivo de estado
+            self._persister = TokenStatePersister(self._state_file)
             self._load_token_from_file()  # Tenta carregar o token do arquivo
             self._initialized = True  # Prevent re-initialization
             logger.info(f"URL: {url}")
 
+    def apply_settings(self, settings: Settings):
+        """
+        Applies reloaded settings; subscribed to SettingsManager by the app.
+
+        ``use_mock`` is kept from startup, since it also decides which
+        restaurant client is built.
+        """
+        self.refresh_fraction = settings.token_refresh_fraction
+        self._url = settings.coti_cloud_services_url
+        if settings.use_mock != self.use_mock:
+            logger.warning("app_mode changes only take effect after a restart.")
+
     def _load_token_from_file(self):
         """Carrega o token e a data de expiração do arquivo JSON, se existir."""
-        if os.path.exists(self._state_file):
-            try:
-                with open(self._state_file, "r") as f:
-                    data = json.load(f)
-                    self.token = data.get("token")
-                    self.token_expiration = data.get("token_expiration")
-                    logger.info("Token carregado do arquivo.")
-                    if self.token and not self.is_token_expired():
-                        self.state = "Authenticated"
-                        logger.info("Token válido carregado. Estado definido como 'Authenticated'.")
-                    else:
-                        logger.info("Token expirado ou inválido no arquivo.")
-                        self.token = None
-                        self.token_expiration = None
-                        self.state = "Unauthenticated"
-                        self._delete_token_file()
-            except Exception as e:
-                logger.error(f"Erro ao carregar o token do arquivo: {e}")
-                self.token = None
-                self.token_expiration = None
-                self.state = "Unauthenticated"
-                self._delete_token_file()
-        else:
+        try:
+            data = self._persister.load()
+        except Exception as e:
+            logger.error(f"Erro ao carregar o token do arquivo: {e}")
+            self._clear_token()
+            self._persister.delete()
+            return
+        if data is None:
             logger.info("Arquivo de estado do token não encontrado. Estado definido como 'Unauthenticated'.")
+            return
+
+        self.token = data.get("token")
+        self.token_expiration = data.get("token_expiration")
+        logger.info("Token carregado do arquivo.")
+        if self.token and not self.is_token_expired():
+            self.state = "Authenticated"
+            # The issue time isn't stored; count the lifetime from now
+            self.token_issued_at = time.time()
+            self._token_available.set()
+            logger.info("Token válido carregado. Estado definido como 'Authenticated'.")
+        else:
+            logger.info("Token expirado ou inválido no arquivo.")
+            self._clear_token()
+            self._persister.delete()
+
+    def _clear_token(self):
+        self.token = None
+        self.token_expiration = None
+        self.token_issued_at = None
+        self.state = "Unauthenticated"
 
     def _save_token_to_file(self):
-        """Salva o token e a data de expiração no arquivo JSON."""
-        try:
-            with open(self._state_file, "w") as f:
-                json.dump({
-                    "token": self.token,
-                    "token_expiration": self.token_expiration
-                }, f)
-            logger.info("Token salvo no arquivo com sucesso.")
-        except Exception as e:
-            logger.error(f"Erro ao salvar o token no arquivo: {e}")
+        """Agenda a gravação do token e da data de expiração no arquivo JSON."""
+        self._persister.save(
+            {"token": self.token, "token_expiration": self.token_expiration}
+        )
 
-    def _delete_token_file(self):
-        """Remove o arquivo de estado do token, se existir."""
-        try:
-            if os.path.exists(self._state_file):
-                os.remove(self._state_file)
-                logger.info("Arquivo de estado do token removido.")
-        except Exception as e:
-            logger.error(f"Erro ao remover o arquivo de estado do token: {e}")
+    async def flush_state(self):
+        """Wait for pending writes of the state file, e.g. on shutdown."""
+        await self._persister.flush()
 
     async def authenticate(self):
         logger.info(f"[TokenManager] State: {self.state}")
-        logger.info(f"[TokenManager] Token: {self.token}")
         if self.state == "Authenticated" and self.token and not self.is_token_expired():
             logger.info("[TokenManager] Token is still valid.")
             return self.token  # Token is still valid
+        return await self._renew_token()
+
+    async def _renew_token(self) -> str:
+        """
+        Start an authentication, or join the one already in flight.
 
-        self.state = "Authenticating"
+        Every caller awaits the same future, so they are all woken as soon as
+        it completes instead of polling the state.
+        """
+        if self._renewal is None or self._renewal.done():
+            self._renewal = asyncio.ensure_future(self._run_authentication())
+        # Shielded so a cancelled caller doesn't abort it for the others
+        return await asyncio.shield(self._renewal)
+
+    async def _run_authentication(self) -> str:
+        # A proactive renewal keeps serving the current token meanwhile
+        has_valid_token = self.token is not None and not self.is_token_expired()
+        if not has_valid_token:
+            self.state = "Authenticating"
         logger.info("[TokenManager] Starting authentication process.")
-        success = await self._perform_authentication()
+        with TOKEN_REFRESH_SECONDS.time():
+            success = await self._perform_authentication()
+        TOKEN_REFRESH_EVENTS.inc(event="refresh_success" if success else "refresh_failure")
         if success:
             self.state = "Authenticated"
+            self.token_issued_at = time.time()
+            self._token_available.set()
             logger.info("[TokenManager] Authentication successful.")
             self._save_token_to_file()  # Salva o token após sucesso
             return self.token
-        else:
-            self.state = "Unauthenticated"
-            logger.error("[TokenManager] Authentication failed.")
-            self._delete_token_file()  # Remove o arquivo se a autenticação falhar
-            raise HTTPException(status_code=401, detail="Authentication failed.")
+
+        logger.error("[TokenManager] Authentication failed.")
+        # The current token may have expired while the renewal was running
+        if self.token is None or self.is_token_expired():
+            self._clear_token()
+            self._persister.delete()  # Remove o arquivo se a autenticação falhar
+        raise HTTPException(status_code=401, detail="Authentication failed.")
 
     async def _perform_authentication(self):
         if self.use_mock:
@@ -126,8 +174,13 @@ class TokenManager:
                 logger.debug("Mock authentication failed.")
                 return False
         else:
-            # Real authentication logic using HTTPSClient
-            client = HTTPSClient()
+            # Real authentication logic, awaited so a slow cloud endpoint
+            # doesn't block the event loop
+            if self._https_client is None:
+                self._https_client = AsyncHTTPSClient()
+            if self._device_prober is None:
+                self._device_prober = DeviceAuthProber()
+            client = self._https_client
             username = "info@xd.pt"
             password = "xd"
             username_app = "XDBR.105112"
@@ -136,31 +189,33 @@ class TokenManager:
             client_secret = ""  # If a client secret is required, add it here.
 
             # Step 1: Authenticate
-            logger.debug("Autenticando com HTTPSClient.")
-            success = client.authenticate(username, password, client_id, client_secret)
+            logger.debug("Autenticando com AsyncHTTPSClient.")
+            success = await client.authenticate(
+                username, password, client_id, client_secret
+            )
             if not success:
-                logger.error("Authentication failed in HTTPSClient.")
+                logger.error("Authentication failed in AsyncHTTPSClient.")
                 return False
 
-            logger.info("Authentication successful in HTTPSClient.")
+            logger.info("Authentication successful in AsyncHTTPSClient.")
 
             # Step 2: Match credentials
             logger.debug("Matching credentials.")
-            matched_credentials = client.match_credentials(username_app, password_app)
+            matched_credentials = await client.match_credentials(username_app, password_app)
             if not matched_credentials:
                 logger.error("Failed to match credentials.")
                 return False
 
             logger.info("Credentials matched successfully.")
 
-            # Step 3: Try each credential until one works
-            device_config = client.try_all_credentials_until_success(
-                matched_credentials
-            )
-            if device_config:
+            # Step 3: Probe the credentials concurrently; the first one that
+            # works wins
+            result = await self._device_prober.probe(matched_credentials)
+            if result:
+                _, device_config = result
                 logger.info("Device configuration received.")
 
-                # Use the access token from HTTPSClient
+                # Use the token from the device configuration
                 self.token = device_config["Token"]
 
                 # Set the token expiration time based on actual token lifetime
@@ -180,74 +235,88 @@ class TokenManager:
                 )
                 return False
 
-    def is_token_expired(self):
-        # Check if the token is expired
-        logger.info(f"Token expiration timestamp: {self.token_expiration}")
-        if not self.token_expiration:
-            logger.warning("Token expiration not set. Considered expired.")
-            return True
-        is_expired = time.time() >= self.token_expiration
-        if is_expired:
-            logger.warning("Token has expired.")
-            self.token = None
-            self.token_expiration = None
-            self._delete_token_file()  # Remove o arquivo se o token expirou
-        else:
-            time_left = self.token_expiration - time.time()
-            logger.debug(f"Token is valid for {time_left:.2f} more seconds.")
-        return is_expired
+    def is_token_expired(self) -> bool:
+        """
+        In-memory expiry check.
+
+        Called several times per request, so it neither logs nor touches the
+        state file; expired tokens are replaced by the next renewal.
+        """
+        expiration = self.token_expiration
+        return expiration is None or time.time() >= expiration
 
     async def get_token(self):
-        # Lock access to the token to ensure a single authentication
-        logger.info(f"State: {self.state}")
-        async with self.token_lock:
-            logger.debug("Entering get_token - Current state: %s", self.state)
-
-            # If already authenticated and token is valid, return the token directly
-            if self.state == "Authenticated" and not self.is_token_expired():
-                logger.debug("Token is valid and authenticated, returning token.")
-                return self.token
-
-            # If authentication is already in progress, wait until it completes
-            if self.state == "Authenticating":
-                logger.debug(
-                    "Authentication already in progress, waiting for it to complete."
-                )
-                while self.state == "Authenticating":
-                    await asyncio.sleep(0.1)  # Briefly wait before checking again
-                # After waiting, check if the state is now authenticated
-                if self.state == "Authenticated" and not self.is_token_expired():
-                    logger.debug(
-                        "Authentication completed by another process, returning token."
-                    )
-                    return self.token
-                else:
-                    # If authentication failed, raise an error
-                    logger.error("Authentication failed during wait.")
-                    raise HTTPException(
-                        status_code=401, detail="Authentication failed."
-                    )
-
-            # Otherwise, start a new authentication
-            logger.debug("Starting new authentication process.")
-            self.state = "Authenticating"
+        # Hot path: a valid token is returned without locking or waiting; the
+        # background refresh renews it before it expires
+        if self.state == "Authenticated" and not self.is_token_expired():
+            return self.token
+
+        # Otherwise join (or start) the single authentication in flight
+        logger.debug("No valid token, waiting for authentication.")
+        try:
+            return await self._renew_token()
+        except HTTPException as e:
+            logger.error("Error during authentication.")
+            raise e
+
+    def _next_refresh_delay(self) -> Optional[float]:
+        """Seconds until the proactive refresh is due, or None without a token."""
+        if not self.token or not self.token_expiration:
+            return None
+        now = time.time()
+        issued_at = self.token_issued_at or now
+        refresh_at = issued_at + (self.token_expiration - issued_at) * self.refresh_fraction
+        return max(0.0, refresh_at - now)
+
+    def start_background_refresh(self):
+        """Renew the token at ``refresh_fraction`` of its lifetime, in the background."""
+        if self._background_refresh is None or self._background_refresh.done():
+            self._background_refresh = asyncio.create_task(self._refresh_loop())
+
+    async def stop_background_refresh(self):
+        task, self._background_refresh = self._background_refresh, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _refresh_loop(self):
+        failures = 0
+        while True:
+            delay = self._next_refresh_delay()
+            if delay is None or self.is_token_expired():
+                # Nothing to renew until a request obtains a new token
+                failures = 0
+                self._token_available.clear()
+                await self._token_available.wait()
+                continue
+
+            await asyncio.sleep(delay)
+            if self._next_refresh_delay() != 0.0:
+                continue  # The token changed while sleeping; reschedule
             try:
-                await self.authenticate()
-                logger.debug("Authentication process completed, returning token.")
-                return self.token
-            except HTTPException as e:
-                logger.error("Error during authentication.")
-                raise e
+                await self._renew_token()
+                failures = 0
+                logger.info("[TokenManager] Token renewed in the background.")
+            except Exception as e:
+                # The current token stays in use; retry with backoff until it expires
+                failures += 1
+                backoff = min(60.0, 2.0**failures)
+                logger.warning(
+                    f"[TokenManager] Background renewal failed ({e}), retrying in {backoff:.0f}s."
+                )
+                await asyncio.sleep(backoff)
 
     async def is_authenticated(self):
         self.state = "Authenticated" if self.token and not self.is_token_expired() else "Unauthenticated"
         return self.state == "Authenticated"
 
     async def set_unauthenticated(self):
-        self.state = "Unauthenticated"
-        self.token = None
-        self.token_expiration = None
-        self._delete_token_file()  # Remove o arquivo ao definir como não autenticado
+        TOKEN_REFRESH_EVENTS.inc(event="invalidated")
+        self._clear_token()
+        self._persister.delete()  # Remove o arquivo ao definir como não autenticado
         logger.info("Estado definido como 'Unauthenticated' e token removido.")
         return self.state
 
@@ -263,6 +332,7 @@ class TokenManager:
 
         # Autenticar para gerar e salvar o token
         token_before = await self.authenticate()
+        await self.flush_state()
 
         # Verificar se o arquivo de estado foi criado
         if not os.path.exists(self._state_file):
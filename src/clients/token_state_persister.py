@@ -0,0 +1,82 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenStatePersister:
+    """
+    Write-behind persistence of the token state file.
+
+    ``save`` and ``delete`` only record the latest state and return; a single
+    background task writes it off the event loop, so bursts of changes collapse
+    into one write. Files are replaced atomically, so a crash never leaves a
+    partial state file behind. Without a running loop (e.g. during startup)
+    the write happens inline.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pending: Optional[Dict] = None  # None means "delete the file"
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self.writes = 0
+
+    def load(self) -> Optional[Dict]:
+        """Read the persisted state, or None if there is no file."""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def save(self, state: Dict):
+        self._schedule(state)
+
+    def delete(self):
+        self._schedule(None)
+
+    def _schedule(self, state: Optional[Dict]):
+        self._pending = state
+        self._dirty = True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_pending()
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    def _write_pending(self):
+        state = self._pending
+        self._dirty = False
+        self._write(state)
+
+    async def _drain(self):
+        while self._dirty:
+            state = self._pending
+            self._dirty = False
+            await asyncio.to_thread(self._write, state)
+
+    def _write(self, state: Optional[Dict]):
+        try:
+            if state is None:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                    logger.info("Arquivo de estado do token removido.")
+            else:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.path)
+                logger.info("Token salvo no arquivo com sucesso.")
+            self.writes += 1
+        except Exception as e:
+            logger.error(f"Erro ao persistir o estado do token: {e}")
+
+    async def flush(self):
+        """Wait until the latest state is on disk."""
+        if self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
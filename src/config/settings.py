@@ -0,0 +1,192 @@
+import asyncio
+import configparser
+import logging
+import os
+import signal
+from threading import Lock
+from typing import Callable, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_SECTION = "Settings"
+
+
+class Settings(BaseModel):
+    """
+    Typed view of the ``[Settings]`` section of ``config.ini``.
+
+    Field names match the ini keys (configparser lowercases them), and values
+    are validated once when the file is loaded instead of being parsed by
+    every consumer.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, extra="ignore", frozen=True)
+
+    app_mode: str = "prod"
+    coti_cloud_services_url: str = "http://localhost:8005"
+    openai_api_key: str = Field(default="", alias="openaiapikey")
+    token_refresh_fraction: float = Field(default=0.8, gt=0, le=1)
+
+    # MyXD cloud authentication
+    myxd_base_url: str = "https://myxd1.azurewebsites.net"
+    myxd_timeout: float = 10.0
+    myxd_connect_timeout: float = 5.0
+    myxd_max_retries: int = Field(default=2, ge=0)
+    myxd_max_connections: int = Field(default=4, ge=1)
+    device_auth_timeout: float = 5.0
+    device_auth_concurrency: int = Field(default=4, ge=1)
+
+    # POS connection pool
+    pos_host: str = "192.168.15.100"
+    pos_port: int = 8978
+    pos_pool_size: int = Field(default=4, ge=1)
+    pos_pool_idle_timeout: float = 30.0
+    pos_pool_max_lifetime: float = 300.0
+    pos_connect_timeout: float = 5.0
+    pos_read_timeout: float = 5.0
+    table_content_cache_ttl: float = 1.0
+
+    # Product catalog cache
+    product_cache_ttl: float = 300.0
+    product_cache_miss_refresh_interval: float = 30.0
+    product_cache_snapshot_path: Optional[str] = os.path.join("cache", "products.json")
+
+    # Order processing
+    use_llm_parser: bool = False
+    use_llm_enhancer: bool = False
+    save_comanda_files: bool = False
+    llm_prompt_token_budget: int = Field(default=4000, ge=1)
+
+    # LLM chain cache
+    llm_cache_size: int = Field(default=256, ge=1)
+    llm_cache_ttl: float = 3600.0
+    llm_cache_path: Optional[str] = None
+
+    # LLM HTTP clients
+    openai_base_url: Optional[str] = None
+    llm_timeout: float = 30.0
+    llm_connect_timeout: float = 5.0
+    llm_max_retries: int = Field(default=3, ge=0)
+    llm_retry_backoff: float = 0.5
+    llm_retry_backoff_max: float = 8.0
+    llm_max_concurrency: int = Field(default=8, ge=1)
+    llm_max_connections: int = Field(default=20, ge=1)
+
+    @property
+    def use_mock(self) -> bool:
+        return self.app_mode.lower() == "dev"
+
+    @classmethod
+    def from_file(cls, path: str) -> "Settings":
+        """
+        Load and validate the settings file.
+
+        A missing file or section yields the defaults; invalid values raise
+        pydantic's ValidationError.
+        """
+        config = configparser.ConfigParser()
+        config.read(path)
+        if not config.has_section(SETTINGS_SECTION):
+            logger.warning(f"No [{SETTINGS_SECTION}] section in {path}, using defaults.")
+            return cls()
+        # Empty values mean "not set", so the defaults apply
+        values = {key: value for key, value in config[SETTINGS_SECTION].items() if value}
+        return cls.model_validate(values)
+
+
+class SettingsManager:
+    """
+    Loads the settings once and reloads them when the file changes.
+
+    Reloads happen on SIGHUP or when the file's mtime changes (polled every
+    ``poll_interval`` seconds once ``start_watching`` runs). Invalid files are
+    rejected and the previous settings stay active. Subscribers are called with
+    the new settings after every successful reload; components built once at
+    startup (the POS pool, the caches) keep their values until a restart.
+    """
+
+    _instance: Optional["SettingsManager"] = None
+    _singleton_lock = Lock()  # For thread-safe singleton implementation
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            with cls._singleton_lock:
+                if not cls._instance:
+                    cls._instance = super(SettingsManager, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, path: str = "config.ini", poll_interval: float = 5.0):
+        if not hasattr(self, "_initialized"):
+            self.path = path
+            self.poll_interval = poll_interval
+            self._mtime = self._read_mtime()
+            self.settings = Settings.from_file(path)
+            self._subscribers: List[Callable[[Settings], None]] = []
+            self._watch_task: Optional[asyncio.Task] = None
+            self._initialized = True
+
+    def _read_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def subscribe(self, callback: Callable[[Settings], None]):
+        """Call ``callback`` with the new settings after each reload."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def reload(self) -> bool:
+        """Re-read the file, keeping the current settings if it is invalid."""
+        mtime = self._read_mtime()
+        try:
+            settings = Settings.from_file(self.path)
+        except ValidationError as e:
+            logger.error(f"Invalid settings in {self.path}, keeping the current ones: {e}")
+            self._mtime = mtime  # Don't retry until the file changes again
+            return False
+
+        self._mtime = mtime
+        self.settings = settings
+        logger.info(f"Settings reloaded from {self.path}.")
+        for callback in self._subscribers:
+            try:
+                callback(settings)
+            except Exception as e:
+                logger.error(f"Settings subscriber failed: {e}", exc_info=True)
+        return True
+
+    def reload_if_changed(self) -> bool:
+        if self._read_mtime() == self._mtime:
+            return False
+        return self.reload()
+
+    def start_watching(self):
+        """Reload on SIGHUP and poll the file mtime in the background."""
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self.reload)
+        except (AttributeError, NotImplementedError, RuntimeError):
+            logger.debug("SIGHUP reload not available, relying on mtime polling.")
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self.reload_if_changed()
+
+    async def stop_watching(self):
+        task, self._watch_task = self._watch_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        try:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        except (AttributeError, NotImplementedError, RuntimeError):
+            pass
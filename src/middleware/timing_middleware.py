@@ -1,37 +1,81 @@
+import logging
 import time
-import json
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
-
-class TimingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# (method, route, status_code, seconds)
+TimingSink = Callable[[str, str, int, float], None]
+
+_request_started_at: ContextVar[Optional[float]] = ContextVar(
+    "request_started_at", default=None
+)
+
+
+def response_time() -> float:
+    """
+    Seconds since the current request entered TimingMiddleware.
+
+    Routes that want ``response_time`` in their body opt in by calling this
+    right before returning; everything else only gets the header.
+    """
+    started_at = _request_started_at.get()
+    return time.perf_counter() - started_at if started_at is not None else 0.0
+
+
+def route_template(scope: Scope) -> str:
+    """The matched route path (e.g. /tables/{table_id}), to keep labels bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", "<unmatched>")
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI timing layer.
+
+    Adds an ``X-Process-Time`` header (time until the response started) and
+    reports the full request duration to ``sink``, without reading or
+    re-serializing the body, so large JSON lists and streaming responses pass
+    through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, sink: Optional[TimingSink] = None):
+        self.app = app
+        self.sink = sink
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        token = _request_started_at.set(start_time)
+        status_code = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time", f"{process_time:.6f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
         try:
-            # Process the request
-            response = await call_next(request)
-        except Exception as e:
-            # Optionally handle exceptions here
-            raise e
-        
-        process_time = time.time() - start_time
-        
-        # Check if the response is JSON
-        if response.headers.get("Content-Type", "").startswith("application/json"):
-            # Read the original response body
-            body = [section async for section in response.body_iterator]
-            body_str = b"".join(body).decode()
-            data = json.loads(body_str) if body_str else {}
-            
-            # Add the processing time
-            data["response_time"] = process_time
-            
-            # Create a new JSON response with the updated data
-            new_response = JSONResponse(content=data, status_code=response.status_code)
-            
-            return new_response
-        else:
-            # For non-JSON responses, you can add a header instead
-            response.headers["X-Process-Time"] = str(process_time)
-            return response
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_started_at.reset(token)
+            if self.sink is not None:
+                try:
+                    self.sink(
+                        scope["method"],
+                        route_template(scope),
+                        status_code,
+                        time.perf_counter() - start_time,
+                    )
+                except Exception as e:
+                    logger.error(f"Timing sink failed: {e}")
@@ -44,3 +44,18 @@ class Product(BaseModel):
     parentId: Optional[int] = None  # Default to None if not provided
     visible: Optional[bool] = None  # Default to None if not provided
 
+class Pedido(BaseModel):
+    nome_prato: str
+    quantidade: int
+    preco_unitario: float
+
+class ComandaData(BaseModel):
+    numero_comanda: int 
+    porcentagem_desconto: float = 2.0
+    porcentagem_taxa_servico: float = 11.0
+    valor_pratos: float = Field(default=0.0)
+    valor_total_bruto: float = Field(default=0.0)
+    valor_taxa_servico: float = Field(default=0.0)
+    valor_desconto: float = Field(default=0.0)
+    valor_total_desconto: float = Field(default=0.0)
+    pedidos: list[Pedido]
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class ChainCache:
+    """
+    Content-addressed cache for LLM chain outputs.
+
+    Entries are keyed by a hash of (prompt template, model name, temperature,
+    inputs), so identical requests reuse the previous answer instead of calling
+    the model again. An in-memory LRU tier is always used; a SQLite tier is
+    added when ``sqlite_path`` is set, so answers survive restarts; its queries
+    run in a worker thread so they don't block the event loop. Both tiers
+    expire entries after ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 3600.0,
+        sqlite_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.sqlite_path = sqlite_path
+        # key -> (created_at, value, compute_seconds)
+        self._memory: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        if sqlite_path:
+            self._open_db()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ChainCache":
+        """Build the cache from the application settings."""
+        return cls(
+            max_entries=settings.llm_cache_size,
+            ttl=settings.llm_cache_ttl,
+            sqlite_path=settings.llm_cache_path,
+        )
+
+    @staticmethod
+    def make_key(template: str, model_name: str, temperature: float, inputs: Dict) -> str:
+        """Hash everything that determines the model output."""
+        payload = json.dumps(
+            [template, model_name, temperature, inputs],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _open_db(self):
+        os.makedirs(os.path.dirname(self.sqlite_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+        with self._db_lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS chain_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, compute_seconds REAL NOT NULL)"
+            )
+            self._db.execute(
+                "DELETE FROM chain_cache WHERE created_at < ?",
+                (time.time() - self.ttl,),
+            )
+
+    def _get_memory(self, key: str) -> Optional[Tuple[float, str, float]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > self.ttl:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry
+
+    def _put_memory(self, key: str, entry: Tuple[float, str, float]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _get_db(self, key: str) -> Optional[Tuple[float, str, float]]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT created_at, value, compute_seconds FROM chain_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and time.time() - row[0] > self.ttl:
+                with self._db:
+                    self._db.execute("DELETE FROM chain_cache WHERE key = ?", (key,))
+                return None
+        return row
+
+    def _put_db(self, key: str, entry: Tuple[float, str, float]):
+        if self._db is None:
+            return
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO chain_cache "
+                "(key, created_at, value, compute_seconds) VALUES (?, ?, ?, ?)",
+                (key, *entry),
+            )
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return a cached value, promoting SQLite hits to the memory tier."""
+        entry = self._get_memory(key)
+        if entry is None and self._db is not None:
+            entry = await asyncio.to_thread(self._get_db, key)
+            if entry is not None:
+                self._put_memory(key, entry)
+        if entry is None:
+            return None
+        self.hits += 1
+        self.saved_seconds += entry[2]
+        return entry[1]
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Return the cached value for key, or compute and store it."""
+        value = await self.get(key)
+        if value is not None:
+            logger.debug(f"Chain cache hit for {key[:12]}.")
+            return value
+
+        self.misses += 1
+        start = time.perf_counter()
+        value = await compute()
+        await self._put(key, value, time.perf_counter() - start)
+        return value
+
+    async def stream_or_compute(
+        self, key: str, stream: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """
+        Streaming counterpart of get_or_compute.
+
+        A cached value is yielded as a single chunk; otherwise chunks are
+        passed through as they arrive and the joined value is stored once the
+        stream completes.
+        """
+        value = await self.get(key)
+        if value is not None:
+            logger.debug(f"Chain cache hit for {key[:12]}.")
+            yield value
+            return
+
+        self.misses += 1
+        start = time.perf_counter()
+        chunks = []
+        async for chunk in stream():
+            chunks.append(chunk)
+            yield chunk
+        await self._put(key, "".join(chunks), time.perf_counter() - start)
+
+    async def _put(self, key: str, value: str, compute_seconds: float):
+        entry = (time.time(), value, compute_seconds)
+        self._put_memory(key, entry)
+        if self._db is not None:
+            await asyncio.to_thread(self._put_db, key, entry)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+            "entries": len(self._memory),
+        }
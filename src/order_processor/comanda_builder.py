@@ -0,0 +1,93 @@
+from typing import Dict, Iterable, List
+
+from ..models.entity_models import ComandaData, Pedido
+
+
+def format_board_items(items: Iterable[Dict]) -> str:
+    """
+    Render board content items as the comanda text sent to the LLM parser.
+
+    Each line follows the format NOME_ITEM - QUANTIDADE X R$ PRECO = R$ TOTAL.
+    """
+    formatted_order = ""
+    for item in items:
+        product_name = item.get("itemName", "Not found")
+        quantity = item.get("quantity", 1)
+        price = item.get("price", 0.0)
+        total = item.get("total", 0.0)
+        formatted_order += (
+            f"{product_name} - {quantity} X R$ {price:.2f} = R$ {total:.2f}\n"
+        )
+    return formatted_order
+
+
+def pedido_from_board_item(item: Dict) -> Pedido:
+    """
+    Convert a board content item into a Pedido.
+
+    Fractional quantities (e.g. items sold by weight) become a single unit
+    priced at the line total, since Pedido quantities are integers.
+    """
+    quantity = item.get("quantity", 1) or 1
+    total = item.get("total", 0.0)
+    price = item.get("price") or total / quantity
+
+    if float(quantity).is_integer():
+        quantidade, preco_unitario = int(quantity), price
+    else:
+        quantidade, preco_unitario = 1, total
+
+    return Pedido(
+        nome_prato=item.get("itemName", "Not found"),
+        quantidade=quantidade,
+        preco_unitario=preco_unitario,
+    )
+
+
+def consolidate_pedidos(pedidos: Iterable[Pedido]) -> List[Pedido]:
+    """Merge orders with the same dish and unit price, dropping free items."""
+    consolidated = {}
+    for pedido in pedidos:
+        if pedido.preco_unitario == 0:
+            continue
+
+        key = (pedido.nome_prato, pedido.preco_unitario)
+        if key in consolidated:
+            consolidated[key].quantidade += pedido.quantidade
+        else:
+            # Copy so the caller's orders are left untouched
+            consolidated[key] = pedido.model_copy()
+    return list(consolidated.values())
+
+
+def compute_totals(comanda_data: ComandaData) -> ComandaData:
+    """Fill in the dishes value, service fee, gross total and discount."""
+    comanda_data.valor_pratos = sum(
+        pedido.quantidade * pedido.preco_unitario for pedido in comanda_data.pedidos
+    )
+    comanda_data.valor_taxa_servico = (
+        comanda_data.valor_pratos * comanda_data.porcentagem_taxa_servico / 100
+    )
+    comanda_data.valor_total_bruto = (
+        comanda_data.valor_pratos + comanda_data.valor_taxa_servico
+    )
+    comanda_data.valor_desconto = (
+        comanda_data.valor_total_bruto * comanda_data.porcentagem_desconto / 100
+    )
+    return comanda_data
+
+
+def build_comanda_from_board(table_id: int, items: Iterable[Dict]) -> ComandaData:
+    """
+    Build the processed comanda straight from board content items.
+
+    This is the structured counterpart of OrderProcessorChain.process_comanda:
+    same totals and consolidation, without the LLM round trip.
+    """
+    comanda_data = ComandaData(
+        numero_comanda=table_id,
+        pedidos=[pedido_from_board_item(item) for item in items],
+    )
+    compute_totals(comanda_data)
+    comanda_data.pedidos = consolidate_pedidos(comanda_data.pedidos)
+    return comanda_data
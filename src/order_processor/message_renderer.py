@@ -0,0 +1,152 @@
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Tuple
+
+from ..models.entity_models import ComandaData
+
+DEFAULT_EMOJI = "🍽"
+
+# Keyword -> emoji, checked in order, so more specific keywords come first.
+# Keywords are matched against accent-free, lowercase words of the dish name.
+DISH_EMOJIS: List[Tuple[str, str]] = [
+    ("caipirinha", "🍹"),
+    ("caipiroska", "🍹"),
+    ("drink", "🍸"),
+    ("gin", "🍸"),
+    ("chopp", "🍺"),
+    ("chope", "🍺"),
+    ("cerveja", "🍺"),
+    ("heineken", "🍺"),
+    ("brahma", "🍺"),
+    ("vinho", "🍷"),
+    ("espumante", "🥂"),
+    ("whisky", "🥃"),
+    ("cachaca", "🥃"),
+    ("suco", "🧃"),
+    ("refrigerante", "🥤"),
+    ("coca", "🥤"),
+    ("guarana", "🥤"),
+    ("agua", "💧"),
+    ("cafe", "☕"),
+    ("camarao", "🦐"),
+    ("bacalhau", "🐟"),
+    ("peixe", "🐟"),
+    ("moqueca", "🐟"),
+    ("salmao", "🍣"),
+    ("sushi", "🍣"),
+    ("frango", "🍗"),
+    ("asinha", "🍗"),
+    ("linguica", "🌭"),
+    ("salsicha", "🌭"),
+    ("picanha", "🥩"),
+    ("costela", "🥩"),
+    ("fraldinha", "🥩"),
+    ("maminha", "🥩"),
+    ("bife", "🥩"),
+    ("churrasco", "🥩"),
+    ("carne", "🥩"),
+    ("espetinho", "🍢"),
+    ("hamburguer", "🍔"),
+    ("burger", "🍔"),
+    ("pizza", "🍕"),
+    ("batata", "🍟"),
+    ("fritas", "🍟"),
+    ("feijoada", "🥘"),
+    ("risoto", "🍚"),
+    ("arroz", "🍚"),
+    ("salada", "🥗"),
+    ("sopa", "🍲"),
+    ("caldo", "🍲"),
+    ("frios", "🧀"),
+    ("queijo", "🧀"),
+    ("pao", "🍞"),
+    ("pudim", "🍮"),
+    ("quindim", "🍮"),
+    ("brigadeiro", "🍫"),
+    ("chocolate", "🍫"),
+    ("sorvete", "🍨"),
+    ("torta", "🍰"),
+    ("bolo", "🍰"),
+]
+
+ITEM_TEMPLATE = "{emoji} {nome}\n{quantidade} un. x {preco} = {total}"
+SEPARATOR = "\n-----------------------------------\n"
+SUMMARY_TEMPLATE = "✨ Taxa de Serviço: {taxa}\n💳 Total Bruto: {total}\n"
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def format_brl(value: float) -> str:
+    """Format a value as pt-BR currency, e.g. 1234.5 -> 'R$ 1.234,50'."""
+    formatted = f"{value:,.2f}"  # 1,234.50
+    return "R$ " + formatted.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def _normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class DishEmojiIndex:
+    """
+    Maps dish names to emojis by keyword matching.
+
+    Names are resolved once and memoised, so after ``index_names`` has been
+    fed the product catalog, rendering a bill only does dictionary lookups.
+    """
+
+    def __init__(self, keywords: List[Tuple[str, str]] = DISH_EMOJIS):
+        self._rank = {keyword: rank for rank, (keyword, _) in enumerate(keywords)}
+        self._ranked_emojis = [emoji for _, emoji in keywords]
+        self._names: Dict[str, str] = {}
+
+    def _match(self, name: str) -> str:
+        best = None
+        for word in _WORD_RE.findall(_normalize(name)):
+            rank = self._rank.get(word)
+            if rank is None and word.endswith("s"):
+                # Plurals like "batatas" share the singular keyword
+                rank = self._rank.get(word[:-1])
+            if rank is not None and (best is None or rank < best):
+                best = rank
+        return DEFAULT_EMOJI if best is None else self._ranked_emojis[best]
+
+    def emoji_for(self, name: str) -> str:
+        emoji = self._names.get(name)
+        if emoji is None:
+            emoji = self._names[name] = self._match(name)
+        return emoji
+
+    def index_names(self, names: Iterable[str]):
+        """Precompute emojis for the product catalog names."""
+        for name in names:
+            if name:
+                self.emoji_for(name)
+
+
+class MessageRenderer:
+    """Local replacement for the message_enhancer LLM step."""
+
+    def __init__(self, emoji_index: DishEmojiIndex = None):
+        self.emoji_index = emoji_index or DishEmojiIndex()
+
+    def render(self, comanda_data: ComandaData) -> str:
+        """Render the bill with per-dish emojis and pt-BR currency."""
+        message_parts = [
+            ITEM_TEMPLATE.format(
+                emoji=self.emoji_index.emoji_for(pedido.nome_prato),
+                nome=pedido.nome_prato,
+                quantidade=pedido.quantidade,
+                preco=format_brl(pedido.preco_unitario),
+                total=format_brl(pedido.quantidade * pedido.preco_unitario),
+            )
+            for pedido in comanda_data.pedidos
+        ]
+        message_parts.append(SEPARATOR)
+        message_parts.append(
+            SUMMARY_TEMPLATE.format(
+                taxa=format_brl(comanda_data.valor_taxa_servico),
+                total=format_brl(comanda_data.valor_total_bruto),
+            )
+        )
+        return "\n\n".join(message_parts)
@@ -1,73 +1,154 @@
 import asyncio
-import configparser
 import json
-from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, Field
-from prompt import (
-    order_process_prompt,
-    comanda_template,
-    pedido_template,
-    message_enhancer_prompt,
+import logging
+from typing import AsyncIterator, Optional, Tuple
+from prompt import message_enhancer_prompt
+from ..clients.model_client_registry import ModelClientRegistry
+from ..config.settings import Settings, SettingsManager
+from ..utils.metrics import LLM_CALL_SECONDS
+from ..models.entity_models import ComandaData, Pedido
+from .comanda_builder import (
+    build_comanda_from_board,
+    compute_totals,
+    consolidate_pedidos,
 )
+from .chain_cache import ChainCache
+from .message_renderer import MessageRenderer
+from .prompt_compactor import PromptBudgetExceeded, PromptCompactor, PromptRequest
+from .stage_graph import Stage, StageGraph, StageRun
+
+logger = logging.getLogger(__name__)
 
-class Pedido(BaseModel):
-    nome_prato: str
-    quantidade: int
-    preco_unitario: float
-
-class ComandaData(BaseModel):
-    numero_comanda: int 
-    porcentagem_desconto: int = 2.0
-    porcentagem_taxa_servico: int = 11.0
-    valor_pratos: float = Field(default=0.0)
-    valor_total_bruto: float = Field(default=0.0)
-    valor_taxa_servico: float = Field(default=0.0)
-    valor_desconto: float = Field(default=0.0)
-    valor_total_desconto: float = Field(default=0.0)
-    pedidos: list[Pedido]
 
 class OrderProcessorChain:
     _instance = None
 
+    MODEL_NAME = "gpt-4o-mini-2024-07-18"
+    TEMPERATURE = 0.0
+
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
             cls._instance = super(OrderProcessorChain, cls).__new__(cls)
         return cls._instance
 
     def __init__(self):
-        self.config = None
-        self.api_key = None
-        self.comanda_data = None
+        # The instance is shared by concurrent requests, so it only holds
+        # configuration; every pipeline stage takes and returns its data.
+        if not hasattr(self, "_initialized"):
+            self.settings = None
+            self.api_key = None
+            self.use_llm_parser = False
+            self.use_llm_enhancer = False
+            self.chain_cache = None
+            self.model_registry = ModelClientRegistry()
+            self.save_comanda_files = False
+            self.message_renderer = MessageRenderer()
+            self.prompt_compactor = PromptCompactor(self.MODEL_NAME)
+            self.text_graph = self._build_graph(
+                Stage("prompt", self._text_prompt, ["comanda_text"]),
+                Stage("comanda", self.process_prompt, ["prompt"]),
+            )
+            self.board_graph = self._build_graph(
+                Stage("prompt", self._board_prompt, ["table_id", "board_items"]),
+                Stage(
+                    "comanda",
+                    self._comanda_from_board,
+                    ["table_id", "board_items", "prompt"],
+                ),
+            )
+            self._initialized = True
+
+    def _build_graph(self, prompt_stage: Stage, comanda_stage: Stage) -> StageGraph:
+        """
+        Every stage after the comanda only depends on it, so the summary, the
+        message and the comanda file are produced concurrently.
+        """
+        return StageGraph(
+            [
+                prompt_stage,
+                comanda_stage,
+                Stage("summary", self.print_summary, ["comanda"]),
+                Stage("message", self.build_and_save_message, ["comanda"]),
+                Stage("persist", self.save_comanda, ["comanda", "output_file"]),
+            ]
+        )
 
-    def initialize_config(self, config_path: str):
-        """Initializes configuration from the config file."""
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        self.api_key = config["Settings"]["openaiAPIKey"]
+    def apply_settings(self, settings: Settings):
+        """
+        Applies the settings; also called by SettingsManager on every reload.
+
+        The chain cache and the model clients are built from the first
+        settings only.
+        """
+        self.api_key = settings.openai_api_key
+        self.use_llm_parser = settings.use_llm_parser
+        self.use_llm_enhancer = settings.use_llm_enhancer
+        self.save_comanda_files = settings.save_comanda_files
+        self.prompt_compactor.budget = settings.llm_prompt_token_budget
+        if self.chain_cache is None:
+            self.chain_cache = ChainCache.from_settings(settings)
+            self.model_registry.configure(settings)
+        self.settings = settings
+
+    def ensure_config(self):
+        """Uses the shared application settings, loaded on first use only."""
+        if self.settings is None:
+            settings_manager = SettingsManager()
+            self.apply_settings(settings_manager.settings)
+            settings_manager.subscribe(self.apply_settings)
 
     def get_model(self):
-        """Returns an instance of the ChatOpenAI model for processing."""
-        return ChatOpenAI(
-            model_name="gpt-4o-mini-2024-07-18",
-            temperature=0.0,
-            openai_api_key=self.api_key,
+        """Returns the shared ChatOpenAI model for processing."""
+        return self.model_registry.get_model(
+            self.MODEL_NAME, self.api_key, self.TEMPERATURE
         )
 
-    async def process_comanda(self, comanda_text: str):
-        """Processes the 'comanda' and performs corrections if needed."""
-        self.comanda_text = comanda_text
-        print("Chegou Comanda: ", comanda_text)
-        chain = order_process_prompt | self.get_model()
-
-        response = await chain.ainvoke(
-            {
-                "comanda_template": comanda_template,
-                "pedido_template": pedido_template,
-                "comanda": self.comanda_text,
-            }
+    async def invoke_prompt(self, prompt, inputs: dict) -> str:
+        """Runs prompt | model, reusing the cached answer for identical inputs."""
+
+        async def compute():
+            with LLM_CALL_SECONDS.time(prompt=prompt.name or "unnamed"):
+                response = await (prompt | self.get_model()).ainvoke(inputs)
+            return response.content
+
+        if self.chain_cache is None:
+            return await compute()
+
+        key = ChainCache.make_key(
+            prompt.template, self.MODEL_NAME, self.TEMPERATURE, inputs
         )
+        return await self.chain_cache.get_or_compute(key, compute)
+
+    async def stream_prompt(self, prompt, inputs: dict) -> AsyncIterator[str]:
+        """Streaming variant of invoke_prompt, yielding content chunks as they arrive."""
 
-        formatted_response = response.content
+        async def stream():
+            with LLM_CALL_SECONDS.time(prompt=prompt.name or "unnamed"):
+                async for chunk in (prompt | self.get_model()).astream(inputs):
+                    if chunk.content:
+                        yield chunk.content
+
+        if self.chain_cache is None:
+            async for chunk in stream():
+                yield chunk
+            return
+
+        key = ChainCache.make_key(
+            prompt.template, self.MODEL_NAME, self.TEMPERATURE, inputs
+        )
+        async for chunk in self.chain_cache.stream_or_compute(key, stream):
+            yield chunk
+
+    async def parse_comanda(self, comanda_text: str) -> ComandaData:
+        """Parse: turns free-text 'comanda' into ComandaData using the LLM."""
+        return await self.parse_prompt(await self._text_prompt(comanda_text))
+
+    async def parse_prompt(self, prompt_request: PromptRequest) -> ComandaData:
+        """Parse: sends a budget-checked parser prompt to the LLM."""
+        print("Chegou Comanda: ", prompt_request.inputs["comanda"])
+        formatted_response = await self.invoke_prompt(
+            prompt_request.prompt, prompt_request.inputs
+        )
 
         # Clean up the response to get valid JSON
         if formatted_response.startswith("```json"):
@@ -80,45 +161,35 @@ class OrderProcessorChain:
         print("FOrmatted Response: ", formatted_response)
 
         try:
-            self.comanda_data = ComandaData.model_validate_json(formatted_response)
+            return ComandaData.model_validate_json(formatted_response)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format: {e}")
 
-        self.comanda_data.valor_pratos = sum(
-            pedido.quantidade * pedido.preco_unitario for pedido in self.comanda_data.pedidos
-        )
-        self.comanda_data.valor_taxa_servico = (
-            self.comanda_data.valor_pratos * self.comanda_data.porcentagem_taxa_servico / 100
-        )
-        self.comanda_data.valor_total_bruto = (
-            self.comanda_data.valor_pratos + self.comanda_data.valor_taxa_servico
-        )
-        self.comanda_data.valor_desconto = (
-            self.comanda_data.valor_total_bruto * self.comanda_data.porcentagem_desconto / 100
-        )
+    async def process_comanda(self, comanda_text: str) -> ComandaData:
+        """Processes the 'comanda': parse -> compute -> consolidate."""
+        comanda_data = await self.parse_comanda(comanda_text)
+        return self.consolidate_comanda(compute_totals(comanda_data))
+
+    async def process_prompt(self, prompt_request: PromptRequest) -> ComandaData:
+        """Same as process_comanda, for an already built parser prompt."""
+        comanda_data = await self.parse_prompt(prompt_request)
+        return self.consolidate_comanda(compute_totals(comanda_data))
 
-        # Step 1: Consolidate orders
-        self.consolidate_comanda()
+    def process_board(self, table_id: int, board_items: list[dict]) -> ComandaData:
+        """Builds the consolidated 'comanda' from structured board content, without the LLM."""
+        return build_comanda_from_board(table_id, board_items)
 
-    def consolidate_comanda(self):
+    def consolidate_comanda(self, comanda_data: ComandaData) -> ComandaData:
         """Step 1: Consolidates duplicate orders in the 'comanda'."""
-        consolidated = {}
-        for pedido in self.comanda_data.pedidos:
-            if pedido.preco_unitario == 0:
-                continue
-
-            key = (pedido.nome_prato, pedido.preco_unitario)
-            if key in consolidated:
-                consolidated[key].quantidade += pedido.quantidade
-            else:
-                consolidated[key] = pedido
-        self.comanda_data.pedidos = list(consolidated.values())
-
-    def build_message(self):
+        return comanda_data.model_copy(
+            update={"pedidos": consolidate_pedidos(comanda_data.pedidos)}
+        )
+
+    def build_message(self, comanda_data: ComandaData) -> str:
         """Step 2: Builds the message to be saved."""
         message_parts = []
 
-        for pedido in self.comanda_data.pedidos:
+        for pedido in comanda_data.pedidos:
             item_message = (
                 f"🍽 {pedido.nome_prato}\n"
                 f"{pedido.quantidade} un. x R$ {pedido.preco_unitario:.2f} = R$ {pedido.quantidade * pedido.preco_unitario:.2f}"
@@ -128,24 +199,30 @@ class OrderProcessorChain:
         message_parts.append("\n-----------------------------------\n")
 
         summary_message = (
-            f"✨ Taxa de Serviço: R$ {self.comanda_data.valor_taxa_servico:.2f}\n"
-            f"💳 Total Bruto: R$ {self.comanda_data.valor_total_bruto:.2f}\n"
+            f"✨ Taxa de Serviço: R$ {comanda_data.valor_taxa_servico:.2f}\n"
+            f"💳 Total Bruto: R$ {comanda_data.valor_total_bruto:.2f}\n"
         )
         message_parts.append(summary_message)
 
         final_message = "\n\n".join(message_parts)
         return final_message
 
-    async def build_and_save_message(self, output_file: str = None):
-        """Step 3: Builds and optionally saves the enhanced message to a text file."""
-        message = self.build_message()
-
-        # Enhancing message with the model
-        chain = message_enhancer_prompt | self.get_model()
-
-        response = await chain.ainvoke({"message": message})
-
-        enhanced_message = response.content
+    async def build_and_save_message(
+        self, comanda_data: ComandaData, output_file: str = None
+    ) -> str:
+        """
+        Step 3: Builds and optionally saves the enhanced message to a text file.
+
+        The message is rendered locally with per-dish emojis and pt-BR
+        currency; the message_enhancer LLM is only used when
+        ``use_llm_enhancer`` is enabled in config.ini.
+        """
+        if self.use_llm_enhancer:
+            enhanced_message = await self.invoke_prompt(
+                message_enhancer_prompt, {"message": self.build_message(comanda_data)}
+            )
+        else:
+            enhanced_message = self.message_renderer.render(comanda_data)
 
         # Save to file only if output_file is not None
         if output_file:
@@ -155,35 +232,142 @@ class OrderProcessorChain:
         return enhanced_message
 
 
-    async def main(self, comanda_text: str, output_file: str) -> str:
-        """Main function to execute the chain of tasks with a given comanda string."""
-        # Initialize configuration (path to the config file can be passed here)
-        self.initialize_config("config.ini")
-
-        # Step 1: Process and consolidate the comanda data
-        await self.process_comanda(comanda_text)
-
-        # Print result
-        print("-" * 25)
-        print("Comanda processed successfully!")
-        for pedido in self.comanda_data.pedidos:
-            print(
+    def print_summary(self, comanda_data: ComandaData):
+        """Logs the processed comanda at debug level."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        lines = [f"Comanda {comanda_data.numero_comanda} processed successfully!"]
+        for pedido in comanda_data.pedidos:
+            lines.append(
                 f"{pedido.quantidade}x {pedido.nome_prato} - R$ {(pedido.quantidade * pedido.preco_unitario):.2f}"
             )
-        print(f"Taxa de serviço: R$ {self.comanda_data.valor_taxa_servico:.2f}")
-        print(f"Total Bruto: R$ {self.comanda_data.valor_total_bruto:.2f}")
-        print(f"Desconto: R$ {self.comanda_data.valor_desconto:.2f}")
-        print(f"Total com desconto: R$ {self.comanda_data.valor_total_desconto:.2f}")
+        lines.append(f"Taxa de serviço: R$ {comanda_data.valor_taxa_servico:.2f}")
+        lines.append(f"Total Bruto: R$ {comanda_data.valor_total_bruto:.2f}")
+        lines.append(f"Desconto: R$ {comanda_data.valor_desconto:.2f}")
+        lines.append(f"Total com desconto: R$ {comanda_data.valor_total_desconto:.2f}")
+        logger.debug("\n".join(lines))
+
+    async def save_comanda(self, comanda_data: ComandaData, output_file: str):
+        """Saves the processed comanda as JSON when ``save_comanda_files`` is enabled."""
+        if not (self.save_comanda_files and output_file):
+            return None
+
+        def write():
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(comanda_data.model_dump_json(indent=2))
+
+        await asyncio.to_thread(write)
+        return output_file
+
+    async def _text_prompt(self, comanda_text: str) -> PromptRequest:
+        """Builds the parser prompt for a free-text comanda."""
+        await self.prompt_compactor.load_encoding()
+        return self.prompt_compactor.for_text(comanda_text)
+
+    async def _board_prompt(
+        self, table_id: int, board_items: list[dict]
+    ) -> Optional[PromptRequest]:
+        """Builds the compact parser prompt, or None to skip the LLM parser."""
+        if not self.use_llm_parser:
+            return None
+        await self.prompt_compactor.load_encoding()
+        try:
+            return self.prompt_compactor.for_board(table_id, board_items)
+        except PromptBudgetExceeded as e:
+            logger.warning(f"Table {table_id}: {e}, using the structured builder.")
+            return None
+
+    async def _comanda_from_board(
+        self,
+        table_id: int,
+        board_items: list[dict],
+        prompt_request: Optional[PromptRequest],
+    ) -> ComandaData:
+        if prompt_request is not None:
+            return await self.process_prompt(prompt_request)
+        return self.process_board(table_id, board_items)
+
+    async def main(self, comanda_text: str, output_file: str) -> dict:
+        """Main function to execute the chain of tasks with a given comanda string."""
+        self.ensure_config()
+        run = await self.text_graph.run(
+            comanda_text=comanda_text, output_file=output_file
+        )
+        return self._result(run)
+
+    async def main_from_board(
+        self, table_id: int, board_items: list[dict], output_file: str
+    ) -> dict:
+        """
+        Main function for structured board content.
+
+        Totals and consolidation are computed locally; the LLM parser is only
+        used when ``use_llm_parser`` is enabled in config.ini and the compacted
+        prompt fits in ``llm_prompt_token_budget``.
+        """
+        self.ensure_config()
+        run = await self.board_graph.run(
+            table_id=table_id, board_items=board_items, output_file=output_file
+        )
+        return self._result(run)
+
+    async def stream_from_board(
+        self, table_id: int, board_items: list[dict]
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Streaming variant of main_from_board, yielding (event, data) pairs.
+
+        The locally computed totals are yielded as soon as the comanda is
+        built, followed by the message in "message" chunks (token by token
+        when ``use_llm_enhancer`` is enabled) and a final "done" event.
+        """
+        self.ensure_config()
+        prompt_request = await self._board_prompt(table_id, board_items)
+        comanda_data = await self._comanda_from_board(
+            table_id, board_items, prompt_request
+        )
+        yield "totals", {
+            "table_id": table_id,
+            "service_fee": comanda_data.valor_taxa_servico,
+            "total": comanda_data.valor_total_bruto,
+            "orders": [pedido.model_dump() for pedido in comanda_data.pedidos],
+        }
 
-        # Step 3: Build and save the message to a file
-        processed_message =  await self.build_and_save_message()
+        chunks = []
+        if self.use_llm_enhancer:
+            message = self.build_message(comanda_data)
+            async for chunk in self.stream_prompt(
+                message_enhancer_prompt, {"message": message}
+            ):
+                chunks.append(chunk)
+                yield "message", {"text": chunk}
+        else:
+            chunks.append(self.message_renderer.render(comanda_data))
+            yield "message", {"text": chunks[0]}
+
+        yield "done", {"message": "".join(chunks)}
+
+    def _result(self, run: StageRun) -> dict:
+        """Builds the endpoint response from a finished graph run."""
+        comanda_data = run.results["comanda"]
+        logger.info(
+            f"Comanda {comanda_data.numero_comanda} stage timings: "
+            + ", ".join(f"{name}={elapsed:.3f}s" for name, elapsed in run.timings.items())
+        )
+        prompt_request = run.results["prompt"]
+        tokens = None
+        if prompt_request is not None:
+            tokens = prompt_request.metrics(self.prompt_compactor.budget)
+            logger.info(f"Comanda {comanda_data.numero_comanda} prompt tokens: {tokens}")
         return {
             "status": "Message processed successfully",
-            "message": processed_message,
+            "message": run.results["message"],
             "details": {
-                "total": self.comanda_data.valor_total_bruto,
-                "orders": self.comanda_data.pedidos,
-            }
+                "total": comanda_data.valor_total_bruto,
+                "orders": comanda_data.pedidos,
+            },
+            "timings": run.timings,
+            "tokens": tokens,
         }
 
 
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable
+
+import tiktoken
+from prompt import (
+    comanda_template,
+    compact_order_process_prompt,
+    order_process_prompt,
+    pedido_template,
+)
+from .comanda_builder import consolidate_pedidos, format_board_items, pedido_from_board_item
+
+logger = logging.getLogger(__name__)
+
+
+class PromptBudgetExceeded(ValueError):
+    """Raised when a prompt needs more tokens than the configured budget."""
+
+
+@lru_cache(maxsize=None)
+def _encoding_for(model_name: str):
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use; without them we
+        # fall back to the usual ~4 characters per token estimate
+        logger.warning(f"Token encoding unavailable for {model_name}, estimating: {e}")
+        return None
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    encoding = _encoding_for(model_name)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+def _compact_number(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def compact_board_lines(items: Iterable[Dict]) -> str:
+    """
+    Encode board content as QUANTIDADE|NOME_ITEM|PRECO_UNITARIO lines.
+
+    Lines with the same dish and unit price are merged first, so a busy
+    table with repeated rounds costs one line per distinct dish.
+    """
+    pedidos = consolidate_pedidos(pedido_from_board_item(item) for item in items)
+    return "\n".join(
+        f"{pedido.quantidade}|{pedido.nome_prato.replace('|', '/')}|"
+        f"{_compact_number(pedido.preco_unitario)}"
+        for pedido in pedidos
+    )
+
+
+class PromptRequest:
+    """A prompt ready to be sent to the parser, with its token counts."""
+
+    def __init__(self, prompt, inputs: Dict, tokens: int, uncompacted_tokens: int):
+        self.prompt = prompt
+        self.inputs = inputs
+        self.tokens = tokens
+        self.uncompacted_tokens = uncompacted_tokens
+
+    def metrics(self, budget: int) -> Dict[str, int]:
+        return {
+            "prompt_tokens": self.tokens,
+            "uncompacted_tokens": self.uncompacted_tokens,
+            "budget": budget,
+        }
+
+
+class PromptCompactor:
+    """
+    Builds parser prompts within a token budget.
+
+    Board content is pre-aggregated and sent with the compact prompt; free
+    text can only be measured. Prompts over ``budget`` tokens raise
+    PromptBudgetExceeded instead of being sent.
+
+    tiktoken may download its encoding on first use, so callers on the event
+    loop await ``load_encoding`` before counting tokens.
+    """
+
+    def __init__(self, model_name: str, budget: int = 4000):
+        self.model_name = model_name
+        self.budget = budget
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.uncompacted_tokens = 0
+        self.over_budget = 0
+        self._encoding_loaded = False
+
+    async def load_encoding(self):
+        """Load the token encoding in a worker thread, once."""
+        if not self._encoding_loaded:
+            await asyncio.to_thread(_encoding_for, self.model_name)
+            self._encoding_loaded = True
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model_name)
+
+    def _legacy_inputs(self, comanda_text: str) -> Dict:
+        return {
+            "comanda_template": comanda_template,
+            "pedido_template": pedido_template,
+            "comanda": comanda_text,
+        }
+
+    def for_text(self, comanda_text: str) -> PromptRequest:
+        """Measure a free-text comanda with the original parser prompt."""
+        inputs = self._legacy_inputs(comanda_text)
+        tokens = self.count(order_process_prompt.format(**inputs))
+        return self._checked(PromptRequest(order_process_prompt, inputs, tokens, tokens))
+
+    def for_board(self, table_id: int, items: Iterable[Dict]) -> PromptRequest:
+        """Build the compact prompt for board content."""
+        items = list(items)
+        inputs = {"numero_comanda": table_id, "comanda": compact_board_lines(items)}
+        tokens = self.count(compact_order_process_prompt.format(**inputs))
+        uncompacted_tokens = self.count(
+            order_process_prompt.format(**self._legacy_inputs(format_board_items(items)))
+        )
+        return self._checked(
+            PromptRequest(compact_order_process_prompt, inputs, tokens, uncompacted_tokens)
+        )
+
+    def _checked(self, request: PromptRequest) -> PromptRequest:
+        if request.tokens > self.budget:
+            self.over_budget += 1
+            raise PromptBudgetExceeded(
+                f"Prompt needs {request.tokens} tokens, over the budget of {self.budget}"
+            )
+        self.requests += 1
+        self.prompt_tokens += request.tokens
+        self.uncompacted_tokens += request.uncompacted_tokens
+        return request
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "uncompacted_tokens": self.uncompacted_tokens,
+            "saved_tokens": self.uncompacted_tokens - self.prompt_tokens,
+            "over_budget": self.over_budget,
+            "budget": self.budget,
+        }
@@ -0,0 +1,80 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+
+class Stage:
+    """A named pipeline step and the names of the values it takes as arguments."""
+
+    def __init__(self, name: str, fn: Callable[..., Any], inputs: Iterable[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+
+
+class StageRun:
+    """Results and wall-clock durations (in seconds) of one graph run."""
+
+    def __init__(self, results: Dict[str, Any], timings: Dict[str, float]):
+        self.results = results
+        self.timings = timings
+
+
+class StageGraph:
+    """
+    Small async DAG executor.
+
+    Each stage starts as soon as all of its inputs are available, so stages
+    that only depend on the same upstream result run concurrently. Inputs are
+    either run arguments or the names of earlier stages; stages must be listed
+    after the stages they depend on, which keeps the graph acyclic.
+    Stage functions may be sync or async.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names in {names}")
+        self.stages = stages
+
+    async def run(self, **inputs) -> StageRun:
+        loop = asyncio.get_running_loop()
+        values: Dict[str, asyncio.Future] = {}
+        for name, value in inputs.items():
+            values[name] = loop.create_future()
+            values[name].set_result(value)
+
+        timings: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        for stage in self.stages:
+            missing = [name for name in stage.inputs if name not in values]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' has unknown inputs {missing}")
+            dependencies = [values[name] for name in stage.inputs]
+            tasks[stage.name] = values[stage.name] = asyncio.ensure_future(
+                self._run_stage(stage, dependencies, timings)
+            )
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return StageRun(
+            {name: task.result() for name, task in tasks.items()}, timings
+        )
+
+    @staticmethod
+    async def _run_stage(
+        stage: Stage, dependencies: List[asyncio.Future], timings: Dict[str, float]
+    ) -> Any:
+        args = [await dependency for dependency in dependencies]
+        start = time.perf_counter()
+        result = stage.fn(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        timings[stage.name] = time.perf_counter() - start
+        return result
@@ -0,0 +1,59 @@
+import base64
+from functools import lru_cache
+from typing import Any, List, Type, Union
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+
+from .metrics import DECODE_SECONDS
+
+BytesLike = Union[bytes, bytearray, memoryview, str]
+
+
+def decode_base64_json(encoded: BytesLike) -> Any:
+    """
+    Decode a Base64 encoded JSON value.
+
+    The decoded bytes go straight to orjson, without an intermediate str copy.
+
+    Args:
+        encoded (BytesLike): The Base64 encoded JSON.
+
+    Returns:
+        Any: The parsed JSON value.
+    """
+    try:
+        with DECODE_SECONDS.time(kind="json"):
+            return orjson.loads(base64.b64decode(encoded))
+    except Exception as e:
+        raise ValueError(f"Error during Base64 decoding or JSON parsing: {e}")
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model_class: Type[BaseModel]) -> TypeAdapter:
+    """Return a cached TypeAdapter validating a list of model_class."""
+    return TypeAdapter(List[model_class])
+
+
+def decode_base64_model_list(
+    encoded: BytesLike, model_class: Type[BaseModel]
+) -> List[BaseModel]:
+    """
+    Decode a Base64 encoded JSON array into a list of pydantic models.
+
+    The whole array is parsed and validated in a single TypeAdapter call, which
+    avoids building the intermediate list of dicts and one model at a time.
+
+    Args:
+        encoded (BytesLike): The Base64 encoded JSON array.
+        model_class (Type[BaseModel]): The model of each item.
+
+    Returns:
+        List[BaseModel]: The validated items.
+    """
+    with DECODE_SECONDS.time(kind=model_class.__name__):
+        try:
+            decoded_bytes = base64.b64decode(encoded)
+        except Exception as e:
+            raise ValueError(f"Error during Base64 decoding or JSON parsing: {e}")
+        return _list_adapter(model_class).validate_json(decoded_bytes)
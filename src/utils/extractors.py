@@ -1,62 +1,137 @@
-import base64
-import json
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from .decoders import decode_base64_json
+
+PARAMETER_KEY = b"[NP]"
+PARAMETER_VALUE = b"[EQ]"
+END_OF_MESSAGE = b"[EOM]"
+WHITESPACE = b" \t\r\n"
+MESSAGE_ID_FIELD = PARAMETER_KEY + b"MESSAGEID" + PARAMETER_VALUE
+
+
+class MessageFields:
+    """
+    Single-pass index of the [NP]key[EQ]value fields of a POS message.
+
+    The response is scanned once and every key is mapped to the (offset, length)
+    of its value in the raw buffer. Values are handed out as memoryview slices,
+    so large Base64 payloads are never copied before they are decoded. Pass the
+    response as bytes to keep that guarantee; a str is encoded (copied) first.
+    """
+
+    def __init__(self, response: Union[str, bytes, bytearray]):
+        if isinstance(response, str):
+            response = response.encode("ascii")
+        self._buffer = response
+        self._view = memoryview(response)
+        self.index: Dict[str, Tuple[int, int]] = self._build_index(response)
+
+    @staticmethod
+    def _build_index(buffer: Union[bytes, bytearray]) -> Dict[str, Tuple[int, int]]:
+        """Map every field key to the (offset, length) of its value."""
+        index = {}
+        message_end = buffer.rfind(END_OF_MESSAGE)
+        if message_end == -1:
+            message_end = len(buffer)
+
+        start = buffer.find(PARAMETER_KEY, 0, message_end)
+        while start != -1:
+            key_start = start + len(PARAMETER_KEY)
+            next_start = buffer.find(PARAMETER_KEY, key_start, message_end)
+            field_end = message_end if next_start == -1 else next_start
+
+            separator = buffer.find(PARAMETER_VALUE, key_start, field_end)
+            if separator != -1:
+                key = buffer[key_start:separator].decode("ascii")
+                value_start = separator + len(PARAMETER_VALUE)
+                value_end = field_end
+                # Same trimming as str.strip(), done on offsets to avoid a copy
+                while value_start < value_end and buffer[value_start] in WHITESPACE:
+                    value_start += 1
+                while value_end > value_start and buffer[value_end - 1] in WHITESPACE:
+                    value_end -= 1
+                # Keep the first occurrence, like a find() from the start would
+                index.setdefault(key, (value_start, value_end - value_start))
+
+            start = next_start
+        return index
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def get(self, key: str) -> Optional[memoryview]:
+        """Return the raw value of a field, or None if the field is missing."""
+        location = self.index.get(key)
+        if location is None:
+            return None
+        offset, length = location
+        return self._view[offset : offset + length]
+
+    def __getitem__(self, key: str) -> memoryview:
+        value = self.get(key)
+        if value is None:
+            raise ValueError(f"No {key} field found in the response")
+        return value
+
+    def get_str(self, key: str) -> str:
+        """Return the value of a field decoded as an ASCII string."""
+        return str(self[key], "ascii")
+
+    def decode_base64_json(self, key: str):
+        """Decode a Base64 encoded JSON field."""
+        return decode_base64_json(self[key])
+
+
+def extract_message_id(message: Union[str, bytes, bytearray]) -> Optional[str]:
+    """
+    Return the MESSAGEID of a message, or None if it has none.
+
+    Only the MESSAGEID field is looked up, so a large response doesn't have to
+    be indexed just to correlate it with its request.
+    """
+    field, parameter_key, end_of_message = MESSAGE_ID_FIELD, PARAMETER_KEY, END_OF_MESSAGE
+    if isinstance(message, str):
+        # Search the string as is; encoding it would copy the whole payload
+        field, parameter_key, end_of_message = (
+            marker.decode("ascii") for marker in (field, parameter_key, end_of_message)
+        )
+    start = message.find(field)
+    if start == -1:
+        return None
+    start += len(field)
+    end = message.find(parameter_key, start)
+    if end == -1:
+        end = message.find(end_of_message, start)
+    if end == -1:
+        end = len(message)
+    value = message[start:end].strip()
+    return value if isinstance(value, str) else value.decode("ascii")
+
 
 def extract_and_decode_board_info(response: str) -> dict:
     """
     Extracts the Base64 encoded BOARDINFO content and decodes it into a dictionary.
-    
+
     Args:
         response (str): The full server response.
-        
+
     Returns:
         dict: The decoded JSON content of the board.
     """
-    # Find the part after "[NP]BOARDINFO[EQ]"
-    board_info_start = response.find("[NP]BOARDINFO[EQ]")
-    if board_info_start == -1:
-        raise ValueError("No BOARDINFO field found in the response")
-
-    # Extract everything after "[NP]BOARDINFO[EQ]"
-    encoded_board_info = response[board_info_start + len("[NP]BOARDINFO[EQ]"):]
-
-    # Find the end of the BOARDINFO part, marked by the next [NP] or [EOM]
-    board_info_end = encoded_board_info.find("[NP]") if "[NP]" in encoded_board_info else encoded_board_info.find("[EOM]")
-    
-    # Get the Base64 string between the delimiters
-    base64_string = encoded_board_info[:board_info_end].strip()  # Make sure to strip out any extra whitespace
-
-    try:
-        # Decode the Base64-encoded content
-        decoded_json_str = base64.b64decode(base64_string).decode('utf-8')
-
-        return json.loads(decoded_json_str)
-    except json.JSONDecodeError as e:
-        # Add detailed error message to help debugging
-        print(f"Failed to parse JSON: {e}")
-        raise ValueError(f"Failed to decode or parse JSON: {e}")
-    except Exception as e:
-        raise ValueError(f"General error during decoding: {e}")
-    
+    return MessageFields(response).decode_base64_json("BOARDINFO")
+
+
 def extract_encoded_object(response: str) -> str:
     """
     Extracts the Base64 encoded portion of the response after '[NP]OBJECT[EQ]'.
-    
+
     Args:
         response (str): The full server response.
-    
+
     Returns:
         str: The Base64 encoded object part.
     """
-    # Find the part after "[NP]OBJECT[EQ]"
-    object_start = response.find("[NP]OBJECT[EQ]")
-    if object_start == -1:
-        raise ValueError("No OBJECT field found in the response")
-
-    # Extract everything after "[NP]OBJECT[EQ]"
-    encoded_object = response[object_start + len("[NP]OBJECT[EQ]"):]
-    # Find the next "[NP]" or "[EOM]" which marks the end of the OBJECT field
-    object_end = encoded_object.find("[NP]") if "[NP]" in encoded_object else encoded_object.find("[EOM]")
-    if object_end == -1:
-        raise ValueError("End of OBJECT field not found in the response")
-    # Return the Base64 string between the delimiters
-    return encoded_object[:object_end].strip()
\ No newline at end of file
+    return MessageFields(response).get_str("OBJECT")
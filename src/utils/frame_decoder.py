@@ -0,0 +1,91 @@
+from typing import List
+
+
+class FrameDecoder:
+    """
+    Incremental decoder for [EOM]-terminated POS messages.
+
+    Received bytes are appended to a single bytearray and only the newly
+    received tail is scanned for the terminator, so large GETDATALIST payloads
+    are processed in linear time. Several frames arriving in one read are all
+    returned, and any trailing partial frame is kept for the next feed.
+    """
+
+    END_OF_MESSAGE = b"[EOM]"
+    MESSAGE_OK = b"MESSAGEOK"
+
+    MIN_READ_SIZE = 4096
+    MAX_READ_SIZE = 256 * 1024
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._eom_scan_from = 0
+        self._ok_scan_from = 0
+        self.read_size = self.MIN_READ_SIZE
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Append received bytes and return every frame they complete.
+
+        Args:
+            data (bytes): The bytes returned by the last socket read.
+
+        Returns:
+            List[bytes]: Complete frames, each including its [EOM] terminator.
+        """
+        # A read that fills the whole buffer means more data is waiting, so
+        # grow the read size to cut down on the number of recv calls.
+        if len(data) >= self.read_size:
+            self.read_size = min(self.read_size * 2, self.MAX_READ_SIZE)
+
+        self._buffer += data
+
+        frames = []
+        frame_start = 0
+        view = memoryview(self._buffer)
+        try:
+            while True:
+                end = self._buffer.find(self.END_OF_MESSAGE, self._eom_scan_from)
+                if end == -1:
+                    break
+                end += len(self.END_OF_MESSAGE)
+                frames.append(bytes(view[frame_start:end]))
+                frame_start = self._eom_scan_from = end
+        finally:
+            view.release()
+
+        if frame_start:
+            del self._buffer[:frame_start]
+            self._ok_scan_from = 0
+        # The terminator may be split across reads, so rescan its last bytes
+        self._eom_scan_from = max(
+            0, len(self._buffer) - len(self.END_OF_MESSAGE) + 1
+        )
+        return frames
+
+    @property
+    def has_message_ok(self) -> bool:
+        """Check if the pending partial frame already carries a MESSAGEOK marker."""
+        found = self._buffer.find(self.MESSAGE_OK, self._ok_scan_from) != -1
+        if not found:
+            self._ok_scan_from = max(
+                0, len(self._buffer) - len(self.MESSAGE_OK) + 1
+            )
+        return found
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered bytes that don't form a complete frame yet."""
+        return len(self._buffer)
+
+    def flush(self) -> bytes:
+        """Return the buffered partial frame and reset the decoder."""
+        data = bytes(self._buffer)
+        self.reset()
+        return data
+
+    def reset(self):
+        """Drop any buffered data."""
+        self._buffer.clear()
+        self._eom_scan_from = 0
+        self._ok_scan_from = 0
@@ -0,0 +1,134 @@
+"""
+Concurrency tests for OrderProcessorChain.
+
+Many tables are processed at once through main() and main_from_board(), with
+a stub model that answers after a random delay so the runs interleave; every
+result must carry the totals and items of its own table only.
+"""
+
+import asyncio
+import json
+import random
+import re
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.config.settings import Settings
+from src.order_processor import prompt_compactor
+from src.order_processor.order_chain import OrderProcessorChain
+
+TABLES = 30
+SERVICE_FEE = 0.11
+
+COMPACT_LINE = re.compile(r"^(\d+)\|(.+)\|([\d.]+)$", re.MULTILINE)
+TEXT_LINE = re.compile(r"^(.+) - (\d+) X R\$ ([\d.]+) = R\$", re.MULTILINE)
+COMANDA_NUMBER = re.compile(r"comanda (\d+)", re.IGNORECASE)
+
+
+def board_items(table_id: int) -> list[dict]:
+    return [
+        {
+            "itemName": f"Prato {table_id}-{k}",
+            "quantity": k,
+            "price": float(table_id + k),
+            "total": float(k * (table_id + k)),
+        }
+        for k in range(1, table_id % 4 + 2)
+    ]
+
+
+def expected_total(table_id: int) -> float:
+    return sum(item["total"] for item in board_items(table_id)) * (1 + SERVICE_FEE)
+
+
+def comanda_text(table_id: int) -> str:
+    lines = [f"Comanda {table_id}"]
+    lines += [
+        f"{item['itemName']} - {item['quantity']} X R$ {item['price']:.2f} "
+        f"= R$ {item['total']:.2f}"
+        for item in board_items(table_id)
+    ]
+    return "\n".join(lines)
+
+
+async def stub_model(prompt_value) -> AIMessage:
+    """Parses the order lines back out of the prompt, after a random delay."""
+    text = prompt_value.to_string()
+    await asyncio.sleep(random.uniform(0, 0.02))
+    if "emojis" in text:
+        # Message enhancer: echo the message
+        return AIMessage(content=text.strip().split("\n\n", 1)[1])
+
+    lines = COMPACT_LINE.findall(text)
+    if lines:
+        pedidos = [(name, int(qty), float(price)) for qty, name, price in lines]
+    else:
+        pedidos = [
+            (name, int(qty), float(price)) for name, qty, price in TEXT_LINE.findall(text)
+        ]
+    answer = {
+        "numero_comanda": int(COMANDA_NUMBER.search(text).group(1)),
+        "pedidos": [
+            {"nome_prato": name, "quantidade": qty, "preco_unitario": price}
+            for name, qty, price in pedidos
+        ],
+    }
+    return AIMessage(content=json.dumps(answer))
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """A fresh OrderProcessorChain answering through the stub model."""
+    monkeypatch.setattr(OrderProcessorChain, "_instance", None)
+    # Keep tiktoken from downloading its encoding during the tests
+    monkeypatch.setattr(prompt_compactor, "_encoding_for", lambda model_name: None)
+    processor = OrderProcessorChain()
+    monkeypatch.setattr(processor, "get_model", lambda: RunnableLambda(stub_model))
+    return processor
+
+
+def assert_own_result(result: dict, table_id: int):
+    details = result["details"]
+    assert details["total"] == pytest.approx(expected_total(table_id))
+    assert sorted(
+        (pedido.nome_prato, pedido.quantidade) for pedido in details["orders"]
+    ) == sorted((item["itemName"], item["quantity"]) for item in board_items(table_id))
+    assert f"Prato {table_id}-1" in result["message"]
+    other = table_id % TABLES + 1
+    assert f"Prato {other}-1" not in result["message"]
+
+
+@pytest.mark.parametrize("use_llm", [False, True])
+def test_concurrent_board_runs_keep_their_own_results(processor, use_llm):
+    processor.apply_settings(
+        Settings(use_llm_parser=use_llm, use_llm_enhancer=use_llm)
+    )
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                processor.main_from_board(table_id, board_items(table_id), None)
+                for table_id in range(1, TABLES + 1)
+            )
+        )
+
+    for table_id, result in enumerate(asyncio.run(run()), start=1):
+        assert_own_result(result, table_id)
+        assert (result["tokens"] is not None) == use_llm
+
+
+def test_concurrent_text_runs_keep_their_own_results(processor):
+    processor.apply_settings(Settings(use_llm_enhancer=True))
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                processor.main(comanda_text(table_id), None)
+                for table_id in range(1, TABLES + 1)
+            )
+        )
+
+    for table_id, result in enumerate(asyncio.run(run()), start=1):
+        assert_own_result(result, table_id)
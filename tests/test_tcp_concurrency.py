@@ -0,0 +1,190 @@
+"""
+Stress tests for concurrent POS calls against the fake POS server.
+
+Every caller sends its own MESSAGEID and must get that MESSAGEID back, both
+with one TCPClient per thread and with callers sharing a TCPConnectionPool.
+"""
+
+import asyncio
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.fake_pos_server import FakePOSServer
+from src.clients.tcp_client import TCPClient
+from src.clients.tcp_connection_pool import TCPConnectionPool
+from src.utils.extractors import MessageFields, extract_message_id
+
+CALLERS = 40
+
+
+def board_request(table_id: int, message_id: str) -> str:
+    return (
+        f"GETBOARDCONTENT[NP]BOARDID[EQ]{table_id}"
+        f"[NP]MESSAGEID[EQ]{message_id}[EOM]"
+    )
+
+
+def data_list_request(message_id: str) -> str:
+    return (
+        "GETDATALIST[NP]OBJECTTYPE[EQ]XDPeople.Entities.MobileItem"
+        f"[NP]PART[EQ]0[NP]LIMIT[EQ]1000[NP]MESSAGEID[EQ]{message_id}[EOM]"
+    )
+
+
+def assert_board_answer(response, table_id: int, message_id: str):
+    assert response is not None
+    assert extract_message_id(response) == message_id
+    assert MessageFields(response).decode_base64_json("BOARDINFO")["id"] == table_id
+
+
+@pytest.fixture
+def server_port():
+    """Run a FakePOSServer on its own thread, so blocking clients can use it."""
+    server = FakePOSServer(products=2000, latency=0.002)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    port = asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    yield port
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def test_parallel_tcp_clients_get_their_own_responses(server_port):
+    def call(table_id: int):
+        with TCPClient(target_ip="127.0.0.1", target_port=server_port) as client:
+            for _ in range(3):
+                message_id = str(uuid.uuid4())
+                response = client.send_data(board_request(table_id, message_id))
+                assert_board_answer(response, table_id, message_id)
+        return table_id
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        assert sorted(executor.map(call, range(1, CALLERS + 1))) == list(
+            range(1, CALLERS + 1)
+        )
+
+
+def test_pooled_calls_get_their_own_responses(server_port):
+    async def run():
+        pool = TCPConnectionPool("127.0.0.1", server_port, size=4)
+
+        async def board(table_id: int):
+            message_id = str(uuid.uuid4())
+            response = await pool.send_data(board_request(table_id, message_id))
+            assert_board_answer(response, table_id, message_id)
+
+        async def data_list():
+            message_id = str(uuid.uuid4())
+            response = await pool.send_data(data_list_request(message_id))
+            assert extract_message_id(response) == message_id
+            assert len(MessageFields(response).decode_base64_json("OBJECT")) == 1000
+
+        calls = [board(table_id) for table_id in range(1, CALLERS + 1)]
+        calls += [data_list() for _ in range(CALLERS // 4)]
+        try:
+            await asyncio.gather(*calls)
+        finally:
+            await pool.close()
+
+    asyncio.run(run())
+
+
+async def _serve(handler):
+    server = await asyncio.start_server(handler, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def _read_requests(reader):
+    buffer = b""
+    while True:
+        data = await reader.read(4096)
+        if not data:
+            return
+        buffer += data
+        while b"[EOM]" in buffer:
+            frame, buffer = buffer.split(b"[EOM]", 1)
+            yield extract_message_id(frame + b"[EOM]")
+
+
+def test_pool_drops_connection_answered_before_eom():
+    async def handler(reader, writer):
+        async for message_id in _read_requests(reader):
+            writer.write(f"MESSAGEOK[NP]MESSAGEID[EQ]{message_id}".encode())
+            await writer.drain()
+            await asyncio.sleep(0.02)  # The terminator arrives late
+            writer.write(b"[EOM]")
+            await writer.drain()
+        writer.close()
+
+    async def run():
+        server, port = await _serve(handler)
+        pool = TCPConnectionPool("127.0.0.1", port, size=1)
+        try:
+            for i in range(4):
+                response = await pool.send_data(f"POSTQUEUE[NP]MESSAGEID[EQ]m{i}[EOM]")
+                assert extract_message_id(response) == f"m{i}"
+                await asyncio.sleep(0.05)
+        finally:
+            await pool.close()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_pool_never_hands_out_unsolicited_frames():
+    async def handler(reader, writer):
+        async for message_id in _read_requests(reader):
+            writer.write(
+                f"REPLY[NP]MESSAGEID[EQ]{message_id}[EOM]"
+                "PUSH[NP]MESSAGEID[EQ]unsolicited[EOM]".encode()
+            )
+            await writer.drain()
+        writer.close()
+
+    async def run():
+        server, port = await _serve(handler)
+        pool = TCPConnectionPool("127.0.0.1", port, size=2)
+        try:
+            responses = await asyncio.gather(
+                *(pool.send_data(f"GET[NP]MESSAGEID[EQ]m{i}[EOM]") for i in range(10))
+            )
+            assert [extract_message_id(r) for r in responses] == [
+                f"m{i}" for i in range(10)
+            ]
+        finally:
+            await pool.close()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_pool_retries_request_dropped_by_idle_connection():
+    async def handler(reader, writer):
+        # Answer one request per connection, then drop it unanswered, like a
+        # POS closing an idle connection just as it is reused
+        answered = False
+        async for message_id in _read_requests(reader):
+            if answered:
+                break
+            writer.write(f"REPLY[NP]MESSAGEID[EQ]{message_id}[EOM]".encode())
+            await writer.drain()
+            answered = True
+        writer.close()
+
+    async def run():
+        server, port = await _serve(handler)
+        pool = TCPConnectionPool("127.0.0.1", port, size=1)
+        try:
+            for i in range(4):
+                response = await pool.send_data(f"GET[NP]MESSAGEID[EQ]m{i}[EOM]")
+                assert extract_message_id(response) == f"m{i}"
+        finally:
+            await pool.close()
+            server.close()
+
+    asyncio.run(run())